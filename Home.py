@@ -1,120 +1,55 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from PIL import Image
-import pandas as pd
-import inflection
+import branca
 import folium
+import numpy as np
 from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
+
+from utils.dataset import current_dataset
+from utils.export import EXPORT_COLUMNS, export_panel
+from utils.hexbin import RESOLUTIONS, load_hexbins
+from utils.memory import MemoryReport
+from utils.scheduler import ChartScheduler
+from utils.sections import SectionTracker
+from utils.warmup import show_warmup_status
 
 st.set_page_config(
     page_title="Home",
     page_icon="📉",
     layout="wide")
+memory = MemoryReport('Home')
+
+
+MAP_WIDTH = 1024
+MAP_HEIGHT = 768
 
 
 # =======================================================================================================================
 # Funções
 # =======================================================================================================================
-def clean_code( df1 ):
-    """ Esta função tem a responsabilidade de limpar o dataframe 
-
-        Tipos de limpeza:
-        1. Remoção das colunas do Dataframe que apresentam valores únicos e que não serão utilizadas
-        2. Mudança do tipo da coluna de dados
-        3. Categorização dos tipos de culinárias
-        4. Remoção das informações duplicadas
-        5. Preenchimento do nome dos países
-        6. Remoção dos restaurantes com a informação de preço para dois zerado
-
-        Input: Dataframe
-        Output: Dataframe    
+def render_map(m):
+    """ HTML do mapa (o mesmo que o folium_static envia ao navegador)
+
+        Gerar o HTML é a parte mais cara do mapa; como texto ele pode ficar no cache de saídas e ser enviado
+        a várias sessões.
     """
-    # 1.Removendo as colunas do Dataframe que não serão utilizadas
-    df1 = df.drop(columns=['Switch to order menu'])
-    
-    # 2.Alteração do tipo de dados para String
-    df1['Cuisines'] = df1['Cuisines'].astype( str )
-    
-    # 3.Mantendo somente um tipo de culinária por restaunte
-    df1['Cuisines_categories'] = df1.loc[:, 'Cuisines'].astype(str).apply(lambda x: x.split(",")[0])
-    
-    # 4.Removendo as informações duplicadas
-    df1 = df1.drop_duplicates().reset_index()
-    
-    # 5.Preenchimento do nome dos países
-    df1['Country Name'] = df1['Country Code'].apply(country_name)
-    
-    # 6.Removendo os restaurantes com preço para dois = 0
-    linhas_selecionadas = df1['Average Cost for two'] != 0
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    # 7.Convertendo a coluna 'Aggregate rating' para float
-    #df1['Aggregate rating'] = df1['Aggregate rating'].astype(float)
-
-    return df1
-
-
-# Função que renomeia as colunas do DataFrame
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
+    return folium.Figure().add_child(m).render()
 
-    return df
-
-
-# Função que retorna os países de acordo com o código
-def country_name(country_id):
-    COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-    }
-
-    return COUNTRIES[country_id]
-
-
-# Função que cria o nome das cores
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-    }
-def color_name(color_code):
-    return COLORS[color_code]
-
-
-def create_map(dataframe):
-    df1 = rename_columns(df)
-    
+
+def show_map(html):
+    components.html(html, width=MAP_WIDTH, height=MAP_HEIGHT + 10)
+
+    return None
+
+
+def create_map(dataframe, linhas_selecionadas):
     f = folium.Figure(width=1920, height=1080)
     m = folium.Map(max_bounds=True).add_to(f)
     marker_cluster = MarkerCluster().add_to(m)
 
-    for _, line in dataframe.iterrows():
+    cols = ['Restaurant Name', 'Average Cost for two', 'Cuisines', 'Currency', 'Aggregate rating', 'Latitude', 'Longitude']
+    for _, line in dataframe.loc[linhas_selecionadas, cols].iterrows():
 
         name = line["Restaurant Name"]
         price_for_two = line["Average Cost for two"]
@@ -141,29 +76,51 @@ def create_map(dataframe):
             icon=folium.Icon(icon="home", prefix="fa"),
         ).add_to(marker_cluster)
 
-    folium_static(m, width=1024, height=768)
+    return render_map(m)
 
-    return None
 
+def create_density_map(hexbins, resolution, countries):
+    """ Mapa de densidade: uma única camada de polígonos com os hexágonos ocupados dos países selecionados
 
-# ================================ Início da Estrutura Lógica do Código =================================================
+        O tamanho do mapa enviado ao navegador cresce com a quantidade de células ocupadas e não com a
+        quantidade de restaurantes.
+    """
+    geojson, max_count = hexbins.geojson(resolution, countries)
 
-# ================================
-# Import dataset
-# ================================
-df = pd.read_csv( 'dataset/zomato.csv' )
+    f = folium.Figure(width=1920, height=1080)
+    m = folium.Map(max_bounds=True).add_to(f)
 
+    # Sem células (nenhum país selecionado): mapa vazio, o GeoJsonTooltip não aceita uma coleção sem feições
+    if not geojson['features']:
+        return render_map(m)
 
-# ===================================
-# Renomeando as colunas do Dataframe
-# ===================================
-df1 = rename_columns(df)
+    colormap = branca.colormap.linear.YlOrRd_09.scale(0, max(np.log1p(max_count), 1))
+    colormap.caption = 'Quantidade de restaurantes (escala log)'
+    folium.GeoJson(
+        geojson,
+        style_function=lambda feature: {
+            'fillColor': colormap(np.log1p(feature['properties']['count'])),
+            'color': '#555555',
+            'weight': 0.5,
+            'fillOpacity': 0.7,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['count', 'rating', 'cost'],
+                                      aliases=['Restaurantes', 'Avaliação média', 'Preço médio para dois']),
+    ).add_to(m)
+    colormap.add_to(m)
 
+    coords = np.concatenate([feature['geometry']['coordinates'][0] for feature in geojson['features']])
+    m.fit_bounds([[coords[:, 1].min(), coords[:, 0].min()], [coords[:, 1].max(), coords[:, 0].max()]])
+
+    return render_map(m)
+
+
+# ================================ Início da Estrutura Lógica do Código =================================================
 
 # ================================
-# Limpando os dados
+# Import dataset (versão limpa publicada e compartilhada entre os processos)
 # ================================
-df1 = clean_code( df )
+version, df1 = current_dataset()
 
 
 # =======================================================================================================================
@@ -181,6 +138,10 @@ country_options = st.sidebar.multiselect('Selecione os países dos quais deseja
                       'England', 'United States of America'],
                       default=['Brazil', 'Australia', 'United States of America', 'New Zeland', 'England', 'Qatar'])
 
+map_mode = st.sidebar.radio('Modo do mapa', ['Marcadores', 'Densidade (hexágonos)'])
+if map_mode == 'Densidade (hexágonos)':
+    resolution = st.sidebar.select_slider('Tamanho dos hexágonos', options=list(RESOLUTIONS), value=list(RESOLUTIONS)[1])
+
 
 
 # =======================================================================================================================
@@ -230,8 +191,21 @@ with st.container():
 
         
 with st.container():
-    map_df = df1.loc[df1['Country Name'].isin(country_options), :]
-    create_map(map_df)
+    linhas_selecionadas = df1['Country Name'].isin(country_options).to_numpy()
+
+    # O HTML do mapa fica no cache de saídas (a seleção padrão já vem pronta do aquecimento) e na sessão:
+    # os reruns causados pelo painel de exportação não refazem o mapa
+    sections = SectionTracker('home', ChartScheduler(serial=True, version=version))
+    if map_mode == 'Densidade (hexágonos)':
+        map_section = sections.section('mapa', version=version, country_options=country_options, map_mode=map_mode,
+                                       resolution=resolution)
+        map_section.submit('map', create_density_map, load_hexbins(version, df1), resolution, country_options)
+    else:
+        map_section = sections.section('mapa', version=version, country_options=country_options, map_mode=map_mode)
+        map_section.submit('map', create_map, df1, linhas_selecionadas)
+    show_map(map_section.result('map'))
+
+    export_panel(df1, {'Países selecionados': np.flatnonzero(linhas_selecionadas)}, EXPORT_COLUMNS, key='home')
     
 
 
@@ -241,4 +215,8 @@ st.markdown(
     - Time de Data Science do Discord
         - @raquelcoelho
     """
-)
\ No newline at end of file
+)
+
+sections.report()
+show_warmup_status()
+memory.report()
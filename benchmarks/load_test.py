@@ -0,0 +1,198 @@
+""" Teste de carga das páginas do dashboard com várias sessões simultâneas
+
+    Cada sessão é um AppTest (streamlit.testing) headless: não há servidor nem rede. As sessões de um mesmo
+    processo rodam em threads, como as sessões de um processo do `streamlit run`, e compartilham o dataset,
+    os índices e o pool de gráficos. Com --processes > 1 o teste simula vários processos do servidor no host.
+
+    A cada rerun a sessão sorteia os países, os tipos de culinária e o slider `num_rest` (quando a página os
+    tem). Os sorteios usam --seed, então duas execuções com os mesmos argumentos geram a mesma carga.
+
+    Uso (na raiz do repositório):
+        python benchmarks/load_test.py --sessions 16 --reruns 10 --processes 2
+"""
+# Bibliotecas
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['Home.py'] + sorted(os.path.relpath(page, ROOT) for page in glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+COUNTRY_LABEL = 'Selecione os países'
+CUISINES_LABEL = 'Selecione os tipos de culinárias'
+NUM_REST_LABEL = 'Selecione a quantidade de restaurantes'
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def rss_mb():
+    """ Memória residente atual e o pico (VmHWM) do processo, em MB """
+    status = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            status[key] = value.strip()
+
+    return int(status['VmRSS'].split()[0]) / 1024, int(status['VmHWM'].split()[0]) / 1024
+
+
+def _widget( widgets, label ):
+    """ Primeiro widget cujo rótulo começa com o texto, ou None se a página não o tem """
+    return next((widget for widget in widgets if widget.label.startswith(label)), None)
+
+
+def share_runtime():
+    """ Permite vários AppTest simultâneos no mesmo processo
+
+        O AppTest instala um Runtime falso global no início de cada run e o remove no fim. Com sessões em
+        threads, o fim do run de uma sessão removeria o Runtime de outra que ainda está rodando. Aqui
+        Runtime.instance() passa a devolver o último Runtime instalado enquanto não houver um atual.
+    """
+    from streamlit.runtime import Runtime
+
+    last = [None]
+
+    def instance( cls ):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        if last[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    def exists( cls ):
+        return cls._instance is not None or last[0] is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    return None
+
+
+def randomize( at, rng ):
+    """ Sorteia os filtros da barra lateral que existem na página """
+    countries = _widget(at.sidebar.multiselect, COUNTRY_LABEL)
+    if countries is not None:
+        countries.set_value(rng.sample(countries.options, rng.randint(1, len(countries.options))))
+
+    cuisines = _widget(at.sidebar.multiselect, CUISINES_LABEL)
+    if cuisines is not None:
+        cuisines.set_value(rng.sample(cuisines.options, rng.randint(1, min(10, len(cuisines.options)))))
+
+    num_rest = _widget(at.sidebar.slider, NUM_REST_LABEL)
+    if num_rest is not None:
+        num_rest.set_value(rng.randint(int(num_rest.min), int(num_rest.max)))
+
+    return None
+
+
+def run_session( page, reruns, seed, timeout ):
+    """ Uma sessão: abre a página e faz `reruns` reruns com filtros sorteados
+
+        Output: lista das latências dos reruns em ms e a quantidade de reruns com exceção
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+
+    latencies = []
+    errors = 0
+    for i in range(reruns + 1):
+        if i > 0:
+            randomize(at, rng)
+        start = time.perf_counter()
+        at.run()
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += len(at.exception) > 0
+
+    # O primeiro run abre a sessão (importações, anexar o dataset): fica fora das latências de rerun
+    return latencies[1:], errors
+
+
+def run_process( process_id, page, sessions, reruns, seed, timeout ):
+    """ Um processo do "servidor": `sessions` sessões simultâneas da página em threads """
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    share_runtime()
+
+    barrier = threading.Barrier(sessions)
+
+    def session( session_id ):
+        barrier.wait()
+        return run_session(page, reruns, seed * 1_000_003 + process_id * 1_000 + session_id, timeout)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        results = list(executor.map(session, range(sessions)))
+    wall = time.perf_counter() - start
+
+    rss, peak = rss_mb()
+    latencies = [latency for session_latencies, _ in results for latency in session_latencies]
+
+    return {'process': process_id, 'latencies': latencies, 'errors': sum(errors for _, errors in results),
+            'wall': wall, 'rss_mb': rss, 'peak_rss_mb': peak}
+
+
+def run_page( page, sessions, processes, reruns, seed, timeout ):
+    """ Executa o teste de uma página e resume as métricas """
+    per_process = [sessions // processes + (i < sessions % processes) for i in range(processes)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(run_process, i, page, n, reruns, seed, timeout) for i, n in enumerate(per_process) if n]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+
+    latencies = np.array([latency for result in results for latency in result['latencies']])
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (0, 0, 0)
+
+    return {'page': page,
+            'sessions': sessions,
+            'processes': processes,
+            'reruns': len(latencies),
+            'errors': sum(result['errors'] for result in results),
+            'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+            'max_ms': latencies.max() if len(latencies) else 0,
+            'throughput': len(latencies) / wall,
+            'rss_mb': [round(result['rss_mb'], 1) for result in results],
+            'peak_rss_mb': [round(result['peak_rss_mb'], 1) for result in results]}
+
+
+def print_report( reports ):
+    header = f'{"página":<28}{"reruns":>8}{"erros":>7}{"p50 ms":>9}{"p90 ms":>9}{"p99 ms":>9}{"máx ms":>9}{"reruns/s":>10}  RSS por processo (MB)'
+    print(header)
+    print('-' * len(header))
+    for r in reports:
+        print(f'{r["page"]:<28}{r["reruns"]:>8}{r["errors"]:>7}{r["p50_ms"]:>9.0f}{r["p90_ms"]:>9.0f}{r["p99_ms"]:>9.0f}'
+              f'{r["max_ms"]:>9.0f}{r["throughput"]:>10.2f}  {r["rss_mb"]} (pico {r["peak_rss_mb"]})')
+
+    return None
+
+
+# ================================ Execução pela linha de comando ========================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Teste de carga das páginas com sessões headless simultâneas')
+    parser.add_argument('--sessions', type=int, default=8, help='sessões simultâneas por página')
+    parser.add_argument('--processes', type=int, default=1, help='processos do servidor simulados')
+    parser.add_argument('--reruns', type=int, default=5, help='reruns com filtros sorteados por sessão')
+    parser.add_argument('--pages', nargs='*', default=PAGES, help='páginas (caminhos relativos à raiz)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=120, help='tempo máximo de um rerun em segundos')
+    parser.add_argument('--json', help='grava o resultado completo neste arquivo')
+    args = parser.parse_args()
+
+    reports = [run_page(page, args.sessions, args.processes, args.reruns, args.seed, args.timeout) for page in args.pages]
+    print_report(reports)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2, default=float)
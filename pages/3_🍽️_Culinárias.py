@@ -1,94 +1,27 @@
 # Bibliotecas
-import pandas as pd
+import numpy as np
 import streamlit as st
 from PIL import Image
 import plotly.express as px
-import inflection
+
+from utils.dataset import current_dataset, share_frame
+from utils.export import EXPORT_COLUMNS, export_panel
+from utils.memory import MemoryReport
+from utils.ranking import load_ranking
+from utils.scheduler import ChartScheduler
+from utils.sections import SectionTracker
+from utils.schema import COLUMN_MAPPING, rename_columns
+from utils.similarity import CANDIDATES, load_similarity
+from utils.table import load_sort_permutations, table_panel
+from utils.warmup import show_warmup_status
 
 
 st.set_page_config( page_title="Visão Culinárias", page_icon="🍽️", layout="wide" )
+memory = MemoryReport('Culinárias')
 
 # =======================================================================================================================
 # Funções
 # =======================================================================================================================
-def clean_code( df1 ):
-    """ Esta função tem a responsabilidade de limpar o dataframe 
-
-        Tipos de limpeza:
-        1. Remoção das colunas do Dataframe que apresentam valores únicos e que não serão utilizadas
-        2. Mudança do tipo da coluna de dados
-        3. Categorização dos tipos de culinárias
-        4. Remoção das informações duplicadas
-        5. Preenchimento do nome dos países
-        6. Remoção dos restaurantes com a informação de preço para dois zerado
-
-        Input: Dataframe
-        Output: Dataframe    
-    """
-    # 1.Removendo as colunas do Dataframe que não serão utilizadas
-    df1 = df.drop(columns=['Switch to order menu'])
-    
-    # 2.Alteração do tipo de dados para String
-    df1['Cuisines'] = df1['Cuisines'].astype( str )
-    
-    # 3.Mantendo somente um tipo de culinária por restaunte
-    df1['Cuisines_categories'] = df1.loc[:, 'Cuisines'].astype(str).apply(lambda x: x.split(",")[0])
-    
-    # 4.Removendo as informações duplicadas
-    df1 = df1.drop_duplicates().reset_index()
-    
-    # 5.Preenchimento do nome dos países
-    df1['Country Name'] = df1['Country Code'].apply(country_name)
-    
-    # 6.Removendo os restaurantes com preço para dois = 0
-    linhas_selecionadas = df1['Average Cost for two'] != 0
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    # 7.Convertendo a coluna 'Aggregate rating' para float
-    #df1['Aggregate rating'] = df1['Aggregate rating'].astype(float)
-
-    return df1
-
-    
-# Função que retorna os países de acordo com o código
-def country_name(country_id):
-    COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-    }
-
-    return COUNTRIES[country_id]
-
-
-# Função que renomeia as colunas do DataFrame
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
-
-    return df
-
-
 # Função que cria o Tipo de Categoria de Comida
 def create_price_tye(price_range):
     if price_range == 1:
@@ -101,23 +34,9 @@ def create_price_tye(price_range):
         return "gourmet"
 
 
-# Função que cria o nome das cores
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-    }
-def color_name(color_code):
-    return COLORS[color_code]
-
-
 # Função que retorna os 10 melhores tipos de culinárias
-def top_best_cuisines( df1 ):
-    df_aux = (df1.loc[:, ['restaurant_id', 'cuisines_categories', 'aggregate_rating']].groupby('cuisines_categories')['aggregate_rating']
+def top_best_cuisines( df1, linhas_selecionadas ):
+    df_aux = (df1.loc[linhas_selecionadas, ['cuisines_categories', 'aggregate_rating']].groupby('cuisines_categories', observed=True)['aggregate_rating']
                                                                   .mean()
                                                                   .round(2)
                                                                   .reset_index()
@@ -131,8 +50,8 @@ def top_best_cuisines( df1 ):
 
 
 # Função que retorna os 10 piores tipos de culinárias
-def top_worst_cuisines( df1 ):
-    df_aux = (df1.loc[:, ['restaurant_id', 'cuisines_categories', 'aggregate_rating']].groupby('cuisines_categories')['aggregate_rating']
+def top_worst_cuisines( df1, linhas_selecionadas ):
+    df_aux = (df1.loc[linhas_selecionadas, ['cuisines_categories', 'aggregate_rating']].groupby('cuisines_categories', observed=True)['aggregate_rating']
                                                                   .mean()
                                                                   .round(2)
                                                                   .reset_index()
@@ -143,27 +62,36 @@ def top_worst_cuisines( df1 ):
     fig.update_layout(title ='Top 10 Piores Tipos de Culinárias', title_x=0.2)
 
     return fig
-    
 
-# ================================ Início da Estrutura Lógica do Código =================================================
 
-# ================================
-# Import dataset
-# ================================
-df = pd.read_csv( 'dataset/zomato.csv' )
+# Função que retorna o melhor restaurante de um tipo de culinária
+def best_restaurant( df1, cuisine ):
+    cols = ['aggregate_rating', 'restaurant_id', 'restaurant_name', 'average_cost_for_two', 'currency', 'votes', 'country_name', 'city']
+    linhas_selecionadas = df1['cuisines_categories'] == cuisine
+    df_aux = df1.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
 
-# ===================================
-# Renomeando as colunas do Dataframe
-# ===================================
-df1 = rename_columns(df)
-df_rest = rename_columns(df)
+    return df_aux
 
 
+# Função que retorna os melhores restaurantes pela avaliação ponderada pelos votos
+def top_restaurants( df1, linhas_selecionadas, ranking, num_rest ):
+    cols = ['restaurant_id', 'restaurant_name', 'country_name', 'city', 'cuisines_categories', 'average_cost_for_two', 'aggregate_rating', 'votes']
+    rows = ranking.top(np.flatnonzero(linhas_selecionadas), num_rest, tiebreak=df1['restaurant_id'].to_numpy())
+    df_aux = df1.iloc[rows][cols]
+    df_aux['weighted_rating'] = ranking.score[rows].round(2)
+
+    return df_aux
+    
+
+# ================================ Início da Estrutura Lógica do Código =================================================
+
 # ================================
-# Limpando os dados
+# Import dataset (versão limpa publicada e compartilhada entre os processos)
 # ================================
-df1 = clean_code( df )
-df_rest = clean_code( df )
+version, df1 = current_dataset()
+ranking = load_ranking(version, df1)
+similarity = load_similarity(version, df1)
+permutations = load_sort_permutations(version, df1)
 
 
 # =======================================================================================================================
@@ -198,10 +126,32 @@ type_cuisines = list(df1['Cuisines_categories'].unique())
 cuisines_options = st.sidebar.multiselect('Selecione os tipos de culinárias:', type_cuisines,
                                          default=['American', 'Italian', 'Arabian', 'Japanese', 'Brazilian'])
 
+scheduler = ChartScheduler.from_sidebar(version)
+sections = SectionTracker('culinarias', scheduler)
+
 
-# Filtro por País e tipo de culinária
-linhas_selecionadas = (df1['Country Name'].isin( country_options )) | (df1['Cuisines_categories'].isin( cuisines_options ))
-df1 = df1.loc[linhas_selecionadas, : ]
+# Filtro por País e tipo de culinária (máscara sobre o dataset compartilhado, sem copiar o Dataframe)
+linhas_selecionadas = ((df1['Country Name'].isin( country_options )) | (df1['Cuisines_categories'].isin( cuisines_options ))).to_numpy()
+
+# Os melhores restaurantes por culinária usam a base completa; o restante usa as linhas selecionadas
+# A renomeação só troca metadados: a visão continua identificada pela versão do dataset no agendador
+df1 = share_frame(rename_columns(df1), version)
+df_rest = df1
+
+# Cálculo das tabelas e gráficos em paralelo (a renderização segue a ordem do layout)
+# Cada seção declara as entradas que lê: só as seções cujas entradas mudaram são recalculadas no rerun
+main_cuisines = ['Italian', 'American', 'Arabian', 'Japanese', 'Brazilian']
+leaderboards = sections.section('melhores_por_culinaria', version=version)
+for cuisine in main_cuisines:
+    leaderboards.submit(cuisine, best_restaurant, df_rest, cuisine)
+
+top_section = sections.section('top_restaurantes', version=version, country_options=country_options,
+                               cuisines_options=cuisines_options, num_rest=num_rest)
+top_section.submit('top_restaurants', top_restaurants, df1, linhas_selecionadas, ranking, num_rest)
+
+charts = sections.section('graficos', version=version, country_options=country_options, cuisines_options=cuisines_options)
+charts.submit('top_best_cuisines', top_best_cuisines, df1, linhas_selecionadas)
+charts.submit('top_worst_cuisines', top_worst_cuisines, df1, linhas_selecionadas)
 
 
 # =======================================================================================================================
@@ -209,123 +159,74 @@ df1 = df1.loc[linhas_selecionadas, : ]
 # =======================================================================================================================
 with st.container():
     st.markdown('### Melhores Restaurantes dos Principais Tipos Culinários')
-    df1 = rename_columns(df1)
-    df_rest = rename_columns(df_rest)
-    cols = ['aggregate_rating', 'restaurant_id', 'restaurant_name', 'average_cost_for_two', 'currency', 'votes', 'country_name', 'city']
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-
-    with col1:
-        linhas_selecionadas = df_rest['cuisines_categories'] == 'Italian'
-        df_aux = df_rest.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
-        italian_rest = df_aux
-
-        st.metric(label=f'Italian: {italian_rest.restaurant_name[0]}', 
-                  value=f'{italian_rest.aggregate_rating[0]}/5.0',
-                  help=f"""
-                  País: {italian_rest.country_name[0]} \n
-                  Cidade: {italian_rest.city[0]} \n
-                  Preço para duas pessoas: {italian_rest.currency[0]}{italian_rest.average_cost_for_two[0]} 
-                  """
-                )
 
-    with col2:
-        linhas_selecionadas = df_rest['cuisines_categories'] == 'American'
-        df_aux = df_rest.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
-        american_rest = df_aux
-
-        st.metric(label=f'American: {american_rest.restaurant_name[0]}', 
-                  value=f'{american_rest.aggregate_rating[0]}/5.0',
-                  help=f"""
-                  País: {american_rest.country_name[0]} \n
-                  Cidade: {american_rest.city[0]} \n
-                  Preço para duas pessoas: {american_rest.currency[0]}{american_rest.average_cost_for_two[0]} 
-                  """
-                )
-
-    with col3:
-        linhas_selecionadas = df_rest['cuisines_categories'] == 'Arabian'
-        df_aux = df_rest.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
-        arabian_rest = df_aux
-
-        st.metric(label=f'Arabian: {arabian_rest.restaurant_name[0]}', 
-                  value=f'{arabian_rest.aggregate_rating[0]}/5.0',
-                  help=f"""
-                  País: {arabian_rest.country_name[0]} \n
-                  Cidade: {arabian_rest.city[0]} \n
-                  Preço para duas pessoas: {arabian_rest.currency[0]}{arabian_rest.average_cost_for_two[0]} 
-                  """
-                )
-
-    with col4:
-        linhas_selecionadas = df_rest['cuisines_categories'] == 'Japanese'
-        df_aux = df_rest.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
-        japanese_rest = df_aux
-
-        st.metric(label=f'Japanese: {japanese_rest.restaurant_name[0]}', 
-                  value=f'{japanese_rest.aggregate_rating[0]}/5.0',
-                  help=f"""
-                  País: {japanese_rest.country_name[0]} \n
-                  Cidade: {japanese_rest.city[0]} \n
-                  Preço para duas pessoas: {japanese_rest.currency[0]}{japanese_rest.average_cost_for_two[0]} 
-                  """
-                )
-
-    with col5:
-        linhas_selecionadas = df_rest['cuisines_categories'] == 'Brazilian'
-        df_aux = df_rest.loc[linhas_selecionadas, cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).reset_index().head()
-        brazilian_rest = df_aux
-
-        st.metric(label=f'Brazilian: {brazilian_rest.restaurant_name[0]}', 
-                  value=f'{brazilian_rest.aggregate_rating[0]}/5.0',
-                  help=f"""
-                  País: {brazilian_rest.country_name[0]} \n
-                  Cidade: {brazilian_rest.city[0]} \n
-                  Preço para duas pessoas: {brazilian_rest.currency[0]}{brazilian_rest.average_cost_for_two[0]} 
-                  """
-                )
+    best_rows = []
+    for col, cuisine in zip(st.columns(5), main_cuisines):
+        with col:
+            best_rest = leaderboards.result(cuisine)
+            best_rows.append(best_rest['index'][0])
+
+            st.metric(label=f'{cuisine}: {best_rest.restaurant_name[0]}', 
+                      value=f'{best_rest.aggregate_rating[0]}/5.0',
+                      help=f"""
+                      País: {best_rest.country_name[0]} \n
+                      Cidade: {best_rest.city[0]} \n
+                      Preço para duas pessoas: {best_rest.currency[0]}{best_rest.average_cost_for_two[0]} 
+                      """
+                    )
 
 with st.container():
-    st.markdown('### Top 10 Restaurantes')
-    
-    cols = ['restaurant_id', 'restaurant_name', 'country_name', 'city', 'cuisines_categories', 'average_cost_for_two', 'aggregate_rating', 'votes']
-    top_rest = df1.loc[: , cols].sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]).head(10)
+    st.markdown(f'### Top {num_rest} Restaurantes')
+    st.caption('Ordenados pela avaliação ponderada pela quantidade de votos (média bayesiana)')
+
+    top_rest = top_section.result('top_restaurants')
     st.dataframe(top_rest)
 
 with st.container():
-    col1, col2 = st.columns(2)
-
-    with col1:
-        fig = top_best_cuisines( df1 )
-        st.plotly_chart( fig, use_container_width=True)
-
-    with col2:
-        fig = top_worst_cuisines( df1 )
-        st.plotly_chart( fig, use_container_width=True)
-        
-
-
-
-    
-        
-
-    
-
-
-
-
-
-
-
-
-
+    st.markdown('### Restaurantes da Seleção')
 
+    table_panel(df1, linhas_selecionadas, permutations, version, key='culinarias_tabela')
 
+with st.container():
+    st.markdown('### Restaurantes Semelhantes')
 
+    # Restaurantes de partida: os melhores de cada culinária e os do Top
+    names = df1['restaurant_name'].to_numpy()
+    cities = df1['city'].to_numpy()
+    start_rows = list(dict.fromkeys(best_rows + top_rest.index.tolist()))
 
+    col1, col2 = st.columns(2)
+    with col1:
+        start_row = st.selectbox('Selecione um restaurante', start_rows, format_func=lambda row: f'{names[row]} ({cities[row]})')
+    with col2:
+        candidates = st.radio('Procurar entre os restaurantes', list(CANDIDATES), horizontal=True)
 
+    rows, scores = similarity.similar(start_row, k=10, candidates=CANDIDATES[candidates],
+                                      exclude=df1['restaurant_id'].to_numpy() == df1['restaurant_id'].iat[start_row])
 
+    cols = ['restaurant_name', 'city', 'cuisines', 'price_range', 'average_cost_for_two', 'currency', 'aggregate_rating', 'votes']
+    df_aux = df1.iloc[rows][cols]
+    df_aux['similaridade'] = scores.round(2)
+    st.dataframe(df_aux)
 
+with st.container():
+    col1, col2 = st.columns(2)
 
+    with col1:
+        fig = charts.result('top_best_cuisines')
+        st.plotly_chart( fig, use_container_width=True)
 
+    with col2:
+        fig = charts.result('top_worst_cuisines')
+        st.plotly_chart( fig, use_container_width=True)
 
+with st.container():
+    export_panel(df1,
+                 {'Top restaurantes': top_rest.index.to_numpy(), 'Seleção atual': np.flatnonzero(linhas_selecionadas)},
+                 [COLUMN_MAPPING[col] for col in EXPORT_COLUMNS],
+                 key='culinarias')
+
+scheduler.report()
+sections.report()
+show_warmup_status()
+memory.report()
@@ -0,0 +1,79 @@
+# Bibliotecas
+import time
+
+import streamlit as st
+from PIL import Image
+
+from utils.dataset import current_dataset
+from utils.export import EXPORT_COLUMNS, export_panel
+from utils.memory import MemoryReport
+from utils.schema import rename_columns
+from utils.search import load_search_index
+from utils.warmup import show_warmup_status
+
+
+st.set_page_config( page_title="Busca de Restaurantes", page_icon="🔎", layout="wide" )
+memory = MemoryReport('Busca')
+
+# ================================ Início da Estrutura Lógica do Código =================================================
+
+# ================================
+# Import dataset e índice de busca (gerado na ingestão)
+# ================================
+version, df1 = current_dataset()
+search_index = load_search_index(version, df1)
+
+
+# =======================================================================================================================
+# Barra Lateral no Streamlit
+# =======================================================================================================================
+st.header('🔎 Busca de Restaurantes')
+
+image = Image.open( 'logo.png' )
+st.sidebar.image( image, width=120 )
+
+#st.sidebar.markdown( '# Fome Zero' )
+st.sidebar.markdown( '#### Conectando pessoas a restaurantes' )
+st.sidebar.markdown( """___""" )
+
+
+country_options = st.sidebar.multiselect('Selecione os países dos quais deseja visualizar as informações (vazio = todos)',
+                      ['India', 'Australia', 'Brazil', 'Canada', 'Indonesia', 'New Zeland', 'Philippines',
+                      'Qatar', 'Singapure', 'South Africa', 'Sri Lanka', 'Turkey', 'United Arab Emirates',
+                      'England', 'United States of America'],
+                      default=[])
+
+num_results = st.sidebar.slider('Selecione a quantidade de resultados', value=20, min_value=5, max_value=100)
+
+st.sidebar.markdown( """___""" )
+st.sidebar.markdown( '##### Powered by Comunidade DS' )
+
+
+# Filtro por país
+linhas_selecionadas = None
+if country_options:
+    linhas_selecionadas = df1['Country Name'].isin( country_options ).to_numpy()
+
+
+# =======================================================================================================================
+# Layout no Streamlit
+# =======================================================================================================================
+with st.container():
+    query = st.text_input('Nome, endereço ou localidade do restaurante', placeholder='Ex.: Las Pinas, pizza hut, sao paulo')
+
+    if query:
+        start = time.perf_counter()
+        rows, scores = search_index.search(query, linhas_selecionadas, k=num_results)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        st.caption(f'{len(rows)} resultados em {elapsed:.1f} ms')
+
+        cols = ['restaurant_name', 'city', 'locality_verbose', 'country_name', 'cuisines', 'average_cost_for_two', 'currency', 'aggregate_rating', 'votes']
+        df_aux = rename_columns(df1).iloc[rows][cols]
+        df_aux['relevancia'] = scores.round(2)
+        st.dataframe(df_aux.reset_index(drop=True))
+
+        export_panel(df1, {'Resultados da busca': rows}, EXPORT_COLUMNS, key='busca')
+
+show_warmup_status()
+memory.report()
@@ -0,0 +1,128 @@
+# Bibliotecas
+import numpy as np
+import streamlit as st
+from PIL import Image
+import plotly.graph_objects as go
+
+from utils.dataset import current_dataset
+from utils.export import EXPORT_COLUMNS, export_panel
+from utils.memory import MemoryReport
+from utils.scatter import MAX_POINT_BUDGET, POINT_BUDGET, binned_counts, stratified_sample
+from utils.scheduler import ChartScheduler
+from utils.warmup import show_warmup_status
+
+
+st.set_page_config( page_title="Dispersão", page_icon="📈", layout="wide" )
+memory = MemoryReport('Dispersão')
+
+AXES = {
+    'Average Cost for two': 'Preço para duas pessoas (moeda local)',
+    'Votes': 'Quantidade de Avaliações',
+    }
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+# Função que cria o gráfico de dispersão da avaliação (WebGL) com no máximo `budget` pontos
+def rating_scatter( df1, linhas_selecionadas, x_col, log_x, budget ):
+    rows = np.flatnonzero(linhas_selecionadas)
+    x = df1[x_col].to_numpy(dtype=np.float64)[rows]
+    y = df1['Aggregate rating'].to_numpy(dtype=np.float64)[rows]
+    countries = df1['Country Name'].to_numpy()[rows]
+    if log_x:
+        x = np.log10(1 + np.maximum(x, 0))
+
+    fig = go.Figure()
+    if len(rows) == 0:
+        return fig, 0
+
+    # Acima do orçamento: contagem de todas as linhas ao fundo e uma amostra estratificada por cima
+    if len(rows) > budget:
+        counts, x_centers, y_centers = binned_counts(x, y)
+        fig.add_trace(go.Heatmap(x=x_centers, y=y_centers, z=np.where(counts > 0, np.log10(np.maximum(counts, 1)), np.nan),
+                                 colorscale='Greys', showscale=False, hoverinfo='skip', opacity=0.6))
+
+    sample = stratified_sample(x, y, budget)
+    for country in np.unique(countries[sample]):
+        points = sample[countries[sample] == country]
+        fig.add_trace(go.Scattergl(x=x[points], y=y[points], mode='markers', name=country,
+                                   marker={'size': 4, 'opacity': 0.6}))
+
+    x_title = f'log10(1 + {AXES[x_col]})' if log_x else AXES[x_col]
+    fig.update_layout(title=f'Avaliação x {AXES[x_col]}', title_x=0.3, xaxis_title=x_title,
+                      yaxis_title='Avaliação', height=650, legend_title='País')
+
+    return fig, len(sample)
+
+
+# ================================ Início da Estrutura Lógica do Código =================================================
+
+# ================================
+# Import dataset (versão limpa publicada e compartilhada entre os processos)
+# ================================
+version, df1 = current_dataset()
+
+
+# =======================================================================================================================
+# Barra Lateral no Streamlit
+# =======================================================================================================================
+st.header('📈 Dispersão das Avaliações')
+
+image = Image.open( 'logo.png' )
+st.sidebar.image( image, width=120 )
+
+#st.sidebar.markdown( '# Fome Zero' )
+st.sidebar.markdown( '#### Conectando pessoas a restaurantes' )
+st.sidebar.markdown( """___""" )
+
+
+country_options = st.sidebar.multiselect('Selecione os países dos quais deseja visualizar as informações',
+                      ['India', 'Australia', 'Brazil', 'Canada', 'Indonesia', 'New Zeland', 'Philippines',
+                      'Qatar', 'Singapure', 'South Africa', 'Sri Lanka', 'Turkey', 'United Arab Emirates',
+                      'England', 'United States of America'],
+                      default=['Brazil', 'Australia', 'United States of America', 'New Zeland', 'England', 'Qatar'])
+
+# Filtro por tipo de culinária (vazio = todas)
+type_cuisines = list(df1['Cuisines_categories'].unique())
+cuisines_options = st.sidebar.multiselect('Selecione os tipos de culinárias (vazio = todas):', type_cuisines, default=[])
+
+x_col = st.sidebar.radio('Eixo horizontal', list(AXES), format_func=lambda col: AXES[col])
+log_x = st.sidebar.checkbox('Escala logarítmica no eixo horizontal', value=True)
+budget = st.sidebar.slider('Máximo de pontos enviados ao navegador', value=POINT_BUDGET, min_value=1_000,
+                           max_value=MAX_POINT_BUDGET, step=1_000)
+
+scheduler = ChartScheduler.from_sidebar(version)
+
+st.sidebar.markdown( """___""" )
+st.sidebar.markdown( '##### Powered by Comunidade DS' )
+
+
+# Filtro por país e tipo de culinária (máscara sobre o dataset compartilhado, sem copiar o Dataframe)
+linhas_selecionadas = df1['Country Name'].isin( country_options ).to_numpy()
+if cuisines_options:
+    linhas_selecionadas &= df1['Cuisines_categories'].isin( cuisines_options ).to_numpy()
+
+scheduler.submit('rating_scatter', rating_scatter, df1, linhas_selecionadas, x_col, log_x, budget)
+
+
+# =======================================================================================================================
+# Layout no Streamlit
+# =======================================================================================================================
+with st.container():
+    fig, points = scheduler.result('rating_scatter')
+    selected = int(linhas_selecionadas.sum())
+
+    if points < selected:
+        st.caption(f'{selected} restaurantes selecionados: {points} pontos de uma amostra estratificada sobre o mapa '
+                   f'de calor com a contagem de todos eles')
+    else:
+        st.caption(f'{selected} restaurantes selecionados, todos exibidos')
+    st.plotly_chart( fig, use_container_width=True)
+
+with st.container():
+    export_panel(df1, {'Seleção atual': np.flatnonzero(linhas_selecionadas)}, EXPORT_COLUMNS, key='dispersao')
+
+scheduler.report()
+show_warmup_status()
+memory.report()
@@ -0,0 +1,73 @@
+""" Inicia o servidor do Streamlit com as páginas pré-aquecidas
+
+    O dataset é anexado e as páginas são aquecidas (utils/warmup.py) no próprio processo do servidor antes de a
+    primeira sessão chegar. Com `streamlit run Home.py` o aquecimento só começa no primeiro acesso ao processo.
+
+    Uso (na raiz do repositório):
+        python serve.py [--wait SEGUNDOS]
+
+    As opções do servidor (porta, endereço) seguem as do Streamlit: .streamlit/config.toml ou as variáveis de
+    ambiente STREAMLIT_SERVER_PORT, STREAMLIT_SERVER_ADDRESS etc.
+"""
+# Bibliotecas
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'on'}
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def env_flag_options():
+    """ Opções do Streamlit definidas em variáveis de ambiente (STREAMLIT_SERVER_PORT -> server.port)
+
+        O `streamlit run` lê essas variáveis na própria linha de comando; aqui o servidor é iniciado com o
+        bootstrap, então elas são convertidas para o formato de flag_options de bootstrap.load_config_options.
+
+        Output: dicionário {'server_port': 8599, ...} com os valores já no tipo de cada opção
+    """
+    from streamlit import config
+
+    flags = {}
+    for key, option in config.get_config_options().items():
+        value = os.environ.get('STREAMLIT_' + key.upper().replace('.', '_'))
+        if value is None:
+            continue
+        if option.multiple:
+            value = tuple(value.split())
+        elif option.type is bool:
+            value = value.strip().lower() in TRUE_VALUES
+        elif option.type in (int, float):
+            value = option.type(value)
+        flags[key.replace('.', '_')] = value
+
+    return flags
+
+
+# ================================ Execução pela linha de comando ========================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor do dashboard com o cache pré-aquecido')
+    parser.add_argument('--wait', type=float, default=0,
+                        help='espera o aquecimento terminar (até este tempo, em segundos) antes de abrir a porta')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from streamlit.web import bootstrap
+
+    from utils import warmup  # registra o aquecimento das páginas
+    from utils.dataset import current_dataset, wait_warmup
+
+    # Publica (se preciso) e anexa a versão vigente; o aquecimento começa em segundo plano
+    current_dataset()
+    if args.wait > 0:
+        wait_warmup(args.wait)
+
+    # Opções do config.toml e das variáveis de ambiente, carregadas antes de o servidor abrir a porta
+    flag_options = env_flag_options()
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(os.path.join(ROOT, 'Home.py'), is_hello=False, args=[], flag_options=flag_options)
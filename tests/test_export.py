@@ -0,0 +1,32 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.export import export_rows
+
+
+def _rows():
+    return pd.DataFrame({'Restaurant Name': ['a', 'b', 'c'], 'Votes': [1, 2, 3], 'City': ['x', 'y', 'z']})
+
+
+def test_empty_selection_keeps_the_header_in_both_formats():
+    df1 = _rows()
+    cols = ['Restaurant Name', 'Votes']
+    empty = np.array([], dtype=np.int64)
+
+    result = export_rows(df1, empty, cols, 'CSV')
+    assert result['rows'] == 0
+    assert result['data'].decode() == 'Restaurant Name,Votes\n'
+
+    result = export_rows(df1, empty, cols, 'Parquet')
+    assert pq.read_table(io.BytesIO(result['data'])).column_names == cols
+
+
+def test_export_keeps_the_selection_order_and_the_row_limit():
+    df1 = _rows()
+    result = export_rows(df1, [2, 0, 1], ['Votes'], 'CSV', max_rows=2)
+
+    assert result['data'].decode() == 'Votes\n3\n1\n'
+    assert result['truncated'] == 'limite de 2 linhas'
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from utils.hexbin import SQRT3, HexBins, aggregate_cells, build_hexbins, hex_cells, hex_polygons
+
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)]
+
+
+def _center( q, r, size ):
+    return size * (SQRT3 * q + SQRT3 / 2 * r), size * 1.5 * r
+
+
+def test_points_map_to_the_nearest_hexagon_center():
+    rng = np.random.default_rng(0)
+    latitude, longitude = rng.uniform(-60, 60, 200_000), rng.uniform(-180, 180, 200_000)
+    size = 0.05
+
+    q, r = hex_cells(latitude, longitude, size)
+    cx, cy = _center(q, r, size)
+    distance = np.hypot(longitude - cx, latitude - cy)
+    for dq, dr in NEIGHBOURS:
+        nx, ny = _center(q + dq, r + dr, size)
+        assert np.all(distance <= np.hypot(longitude - nx, latitude - ny) + 1e-9)
+
+
+def test_polygons_are_closed_hexagons_around_the_center():
+    q, r = np.array([0, 3, -2]), np.array([0, -1, 5])
+    size = 0.25
+    polygons = hex_polygons(q, r, size)
+    cx, cy = _center(q, r, size)
+
+    assert polygons.shape == (3, 7, 2)
+    assert np.allclose(polygons[:, 0], polygons[:, -1])
+    assert np.allclose(np.hypot(polygons[..., 0] - cx[:, None], polygons[..., 1] - cy[:, None]), size)
+    # Hexágonos vizinhos compartilham uma aresta (dois vértices)
+    shared = hex_polygons(np.array([0, 1]), np.array([0, 0]), size).round(9)
+    assert len({tuple(v) for v in shared[0, :6]} & {tuple(v) for v in shared[1, :6]}) == 2
+
+
+def _restaurants():
+    return pd.DataFrame({'Latitude': [0.0, 0.001, 10.0, 0.0], 'Longitude': [0.0, 0.001, 10.0, 0.0],
+                         'Country Code': [1, 1, 1, 30], 'Aggregate rating': [4.0, 3.0, 5.0, 2.0],
+                         'Average Cost for two': [100, 300, 50, 80]})
+
+
+def test_cells_aggregate_per_country_and_hexagon():
+    cells = aggregate_cells(_restaurants(), 0.05)
+
+    assert cells['count'].tolist() == [2, 1, 1]
+    assert cells['country'].tolist() == [1, 1, 30]
+    assert cells['rating'].tolist() == [3.5, 5.0, 2.0]
+    assert cells['cost'].tolist() == [200.0, 50.0, 80.0]
+
+
+def test_geojson_filters_countries_and_handles_an_empty_selection( tmp_path ):
+    build_hexbins(_restaurants(), tmp_path)
+    hexbins = HexBins(tmp_path)
+
+    geojson, max_count = hexbins.geojson('Cidade (~5 km)', ['India'])
+    assert [feature['properties']['count'] for feature in geojson['features']] == [2, 1]
+    assert max_count == 2
+
+    geojson, max_count = hexbins.geojson('Cidade (~5 km)', [])
+    assert geojson['features'] == [] and max_count == 0
@@ -0,0 +1,22 @@
+import numpy as np
+
+from utils.ranking import top_k
+
+
+def test_ties_at_the_kth_score_are_broken_by_the_tiebreak():
+    score = np.array([5.0, 3.0, 3.0, 3.0, 3.0, 1.0, 3.0])
+    restaurant_id = np.array([10, 70, 60, 50, 40, 30, 20])
+
+    assert top_k(score, np.arange(7), 3, tiebreak=restaurant_id).tolist() == [0, 6, 4]
+    assert top_k(score, np.array([1, 2, 3, 5]), 2, tiebreak=restaurant_id).tolist() == [3, 2]
+
+
+def test_top_k_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    score = rng.integers(0, 20, 5_000).astype(np.float64)
+    tiebreak = rng.permutation(5_000)
+    rows = np.flatnonzero(rng.random(5_000) < 0.5)
+
+    expected = rows[np.lexsort((tiebreak[rows], -score[rows]))]
+    for k in (1, 10, 100, len(rows), len(rows) + 5):
+        assert top_k(score, rows, k, tiebreak).tolist() == expected[:k].tolist()
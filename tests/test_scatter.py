@@ -0,0 +1,39 @@
+import numpy as np
+
+from utils.scatter import SAMPLE_GRID, _grid_cells, stratified_sample
+
+
+def _uniform_points( n, seed=0 ):
+    rng = np.random.default_rng(seed)
+    return rng.random(n) * 100, rng.integers(0, 50, n) / 10
+
+
+def test_sample_respects_budget_and_keeps_every_cell():
+    x, y = _uniform_points(200_000)
+    sample = stratified_sample(x, y, budget=10_000)
+
+    assert len(sample) == 10_000
+    assert np.all(np.diff(sample) > 0)
+    cells = _grid_cells(x, y, SAMPLE_GRID)
+    assert set(np.unique(cells[sample])) == set(np.unique(cells))
+
+
+def test_sample_covers_full_x_range_when_budget_is_below_occupied_cells():
+    x, y = _uniform_points(200_000)
+    occupied = len(np.unique(_grid_cells(x, y, SAMPLE_GRID)))
+    budget = 1_000
+    assert occupied > budget
+
+    sample = stratified_sample(x, y, budget=budget)
+
+    assert len(sample) == budget
+    # Pontos nas duas pontas do eixo x (antes o corte removia o lado direito inteiro)
+    assert x[sample].min() < 5
+    assert x[sample].max() > 95
+    counts, _ = np.histogram(x[sample], bins=10, range=(0, 100))
+    assert counts.min() > 0.5 * budget / 10
+
+
+def test_small_selection_is_returned_whole():
+    x, y = _uniform_points(500)
+    np.testing.assert_array_equal(stratified_sample(x, y, budget=1_000), np.arange(500))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataset import share_frame
+from utils.scheduler import ChartScheduler, fingerprint
+
+
+def _summary( df1, linhas_selecionadas ):
+    return df1.loc[linhas_selecionadas].groupby('country')['votes'].sum().reset_index()
+
+
+def _total( summary ):
+    return int(summary['votes'].sum())
+
+
+def test_shared_frame_is_identified_by_version_and_slices_by_content():
+    df1 = share_frame(pd.DataFrame({'country': ['a', 'b', 'a'], 'votes': [1, 2, 3]}), version=7)
+
+    assert fingerprint(df1) == ('dataset', 7, ('country', 'votes'))
+    # Recortes e cópias não são o dataset compartilhado: identificados pelo conteúdo
+    assert fingerprint(df1.iloc[:2])[0] == 'frame'
+    assert fingerprint(df1.copy()) != fingerprint(df1)
+    changed = df1.copy()
+    changed.loc[0, 'votes'] = 10
+    assert fingerprint(changed) != fingerprint(df1.copy())
+
+
+def test_summary_output_is_identified_by_the_mask_that_produced_it():
+    df1 = share_frame(pd.DataFrame({'country': ['a', 'b', 'a'], 'votes': [1, 2, 3]}), version=8)
+    mask = np.array([True, False, True])
+
+    scheduler = ChartScheduler(serial=True, version=8)
+    scheduler.submit('summary', _summary, df1, mask)
+    summary = scheduler.result('summary')
+    key = fingerprint(summary)
+    assert key[0] == 'output'
+    assert fingerprint(mask) in key[1][4]
+
+    scheduler.submit('total', _total, summary)
+    assert scheduler.result('total') == 4
+
+    # Mesma máscara em outro rerun: o resumo e o gráfico derivado vêm do cache
+    rerun = ChartScheduler(serial=True, version=8)
+    rerun.submit('summary', _summary, df1, mask.copy())
+    rerun.submit('total', _total, rerun.result('summary'))
+    assert rerun.result('total') == 4
+    assert rerun._hits == {'summary', 'total'}
+
+
+def test_timing_without_cache_computes_every_task_and_ignores_hits_in_the_speedup():
+    df1 = share_frame(pd.DataFrame({'country': ['a', 'b', 'a'], 'votes': [1, 2, 3]}), version=9)
+    mask = np.array([True, True, False])
+
+    warm = ChartScheduler(serial=True, version=9)
+    warm.submit('summary', _summary, df1, mask)
+    warm.result('summary')
+
+    cached = ChartScheduler(serial=True, version=9)
+    cached.submit('summary', _summary, df1, mask)
+    timing = cached.timings()
+    assert cached._hits == {'summary'}
+    assert timing['speedup'] is None and timing['tasks_ms'] == 0.0
+
+    measured = ChartScheduler(serial=True, version=9, use_cache=False)
+    measured.submit('summary', _summary, df1, mask)
+    measured.submit('total', _total, measured.result('summary'))
+    timing = measured.timings()
+    assert measured._hits == set()
+    assert timing['tasks_ms'] > 0 and timing['speedup'] is not None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from utils.search import _build_field, _trigrams, SearchIndex, build_search_index, normalize
+
+
+def _restaurants():
+    return pd.DataFrame({
+        'Restaurant Name': ['Pizza Hut', 'Café Coffee Day', 'Golden Restaurant', 'Pizza Hut', 'Sushi Bar'],
+        'Address': ['12 Main St', 'Alabang Town Center', '3 Park Ave', 'Avenida Paulista 100', 'Ginza 4'],
+        'Locality': ['Downtown', 'Alabang', 'Midtown', 'Bela Vista', 'Ginza'],
+        'Locality Verbose': ['Downtown, Delhi', 'Alabang, Las Piñas City', 'Midtown, Delhi', 'Bela Vista, São Paulo',
+                             'Ginza, Tokyo'],
+        'City': ['New Delhi', 'Las Piñas City', 'New Delhi', 'São Paulo', 'Tokyo'],
+        })
+
+
+def _index( tmp_path ):
+    df1 = _restaurants()
+    build_search_index(df1, tmp_path)
+
+    return SearchIndex(tmp_path, len(df1))
+
+
+def test_normalize_strips_accents_case_and_punctuation():
+    assert normalize('Las Piñas City') == 'las pinas city'
+    assert normalize("  Café-Coffee   DAY! ") == 'cafe coffee day'
+
+
+def test_build_field_lists_each_row_once_per_trigram():
+    offsets, rows = _build_field(['abc abc', 'xabc', 'zzz'])
+    code = _trigrams(' ab')[0][0]
+
+    assert rows[offsets[code]:offsets[code + 1]].tolist() == [0]
+    assert offsets[-1] == len(rows)
+    # Trigramas que juntam duas palavras não entram no índice
+    assert offsets[_trigrams('c a')[0][0] + 1] == offsets[_trigrams('c a')[0][0]]
+
+
+def test_search_ignores_accents( tmp_path ):
+    rows, scores = _index(tmp_path).search('Las Pinas')
+
+    assert rows.tolist() == [1]
+    assert scores[0] > 0
+
+
+def test_last_word_is_a_prefix( tmp_path ):
+    rows, _ = _index(tmp_path).search('Pizz')
+
+    assert sorted(rows.tolist()) == [0, 3]
+
+
+def test_search_tolerates_typos( tmp_path ):
+    rows, _ = _index(tmp_path).search('Resturant Golden')
+
+    assert rows.tolist()[0] == 2
+
+
+def test_country_mask_restricts_the_results( tmp_path ):
+    index = _index(tmp_path)
+    brazil = np.array([False, False, False, True, False])
+
+    assert index.search('pizza hut', brazil)[0].tolist() == [3]
+    assert index.search('sushi', brazil)[0].tolist() == []
+    assert index.search('!!!')[0].tolist() == []
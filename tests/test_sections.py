@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from utils.scheduler import ChartScheduler
+from utils.sections import Section
+
+
+def _tracker( store ):
+    return SimpleNamespace(store=store, scheduler=ChartScheduler(serial=True))
+
+
+def test_interrupted_rerun_recomputes_only_the_missing_outputs():
+    store = {}
+    calls = []
+
+    def chart( name ):
+        calls.append(name)
+        return name.upper()
+
+    # Primeiro rerun interrompido depois de ler só a primeira tarefa da seção
+    section = Section('graficos', _tracker(store), signature=('v1',))
+    section.submit('best', chart, 'best')
+    section.submit('worst', chart, 'worst')
+    assert section.result('best') == 'BEST'
+
+    # Mesmo rerun de novo, com as mesmas entradas: a saída lida vem da sessão e a que faltou é recalculada
+    calls.clear()
+    section = Section('graficos', _tracker(store), signature=('v1',))
+    section.submit('best', chart, 'best')
+    section.submit('worst', chart, 'worst')
+    assert section.result('best') == 'BEST'
+    assert section.result('worst') == 'WORST'
+    assert calls == ['worst']
+    assert section.recomputed
+
+    # Seção completa: nada é recalculado
+    calls.clear()
+    section = Section('graficos', _tracker(store), signature=('v1',))
+    section.submit('best', chart, 'best')
+    section.submit('worst', chart, 'worst')
+    assert (section.result('best'), section.result('worst')) == ('BEST', 'WORST')
+    assert calls == []
+    assert not section.recomputed
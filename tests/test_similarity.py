@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from utils.similarity import Similarity, build_features, build_similarity
+
+
+def _restaurants():
+    # Linhas 0, 1 e 2 em Nova Délhi (mesma célula), 3 em São Paulo e 4 em Mumbai
+    return pd.DataFrame({
+        'Cuisines': ['Italian, Pizza', 'Italian, Pizza', 'Chinese', 'Italian, Pizza', 'Italian, Pizza'],
+        'Price range': [2, 2, 4, 2, 2],
+        'Country Code': [1, 1, 1, 30, 1],
+        'Average Cost for two': [500, 600, 2000, 50, 550],
+        'Latitude': [28.60, 28.61, 28.62, -23.55, 19.07],
+        'Longitude': [77.20, 77.21, 77.22, -46.63, 72.87],
+        })
+
+
+def _similarity( tmp_path ):
+    build_similarity(_restaurants(), tmp_path)
+
+    return Similarity(tmp_path)
+
+
+def test_features_are_unit_rows():
+    features = build_features(_restaurants())
+    norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+
+    assert np.allclose(norms, 1)
+
+
+def test_same_country_candidates_rank_shared_cuisines_first( tmp_path ):
+    rows, scores = _similarity(tmp_path).similar(0, candidates='country')
+
+    # O próprio restaurante e os de outros países ficam de fora
+    assert rows.tolist() == [1, 4, 2]
+    assert (np.diff(scores) <= 0).all()
+
+
+def test_nearby_candidates_stay_in_the_neighbouring_cells( tmp_path ):
+    rows, _ = _similarity(tmp_path).similar(0, candidates='nearby')
+
+    assert rows.tolist() == [1, 2]
+
+
+def test_excluded_rows_and_k_limit_the_results( tmp_path ):
+    similarity = _similarity(tmp_path)
+    exclude = np.array([False, True, False, False, False])
+
+    assert similarity.similar(0, candidates='country', exclude=exclude)[0].tolist() == [4, 2]
+    assert similarity.similar(0, k=1, candidates='country')[0].tolist() == [1]
+    assert similarity.similar(3, candidates='country')[0].tolist() == []
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from utils.table import TABLE_COLUMNS, SortPermutations, build_sort_permutations
+
+
+def _table_rows():
+    df = pd.DataFrame({col: np.arange(6) for col in TABLE_COLUMNS})
+    df['Aggregate rating'] = [4.0, 3.5, 4.0, 4.5, 3.5, 4.0]
+    df['Country Name'] = pd.Categorical(['India', 'brazil', 'India', 'Qatar', 'Brazil', 'qatar'])
+    df['Locality'] = pd.array(['b', 'A', 'a', 'C', 'b', 'c'], dtype='string')
+
+    return df
+
+
+def test_every_table_column_is_sortable( tmp_path ):
+    build_sort_permutations(_table_rows(), tmp_path)
+    permutations = SortPermutations(tmp_path)
+    everything = np.ones(6, dtype=bool)
+
+    for col in TABLE_COLUMNS:
+        for ascending in (True, False):
+            assert sorted(permutations.sorted_rows(everything, col, ascending)) == list(range(6))
+    assert permutations.sorted_rows(everything, 'Locality', True).tolist() == [1, 2, 0, 4, 3, 5]
+
+
+def test_ties_keep_dataset_order_in_both_directions( tmp_path ):
+    build_sort_permutations(_table_rows(), tmp_path)
+    permutations = SortPermutations(tmp_path)
+    everything = np.ones(6, dtype=bool)
+
+    assert permutations.sorted_rows(everything, 'Aggregate rating', True).tolist() == [1, 4, 0, 2, 5, 3]
+    assert permutations.sorted_rows(everything, 'Aggregate rating', False).tolist() == [3, 0, 2, 5, 1, 4]
+    assert permutations.sorted_rows(everything, 'Country Name', False).tolist() == [3, 5, 0, 2, 1, 4]
+
+    selected = np.array([True, True, False, True, True, True])
+    assert permutations.sorted_rows(selected, 'Aggregate rating', False).tolist() == [3, 0, 5, 1, 4]
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset import RULES
+from utils.validation import coerce_numeric, validate_rows
+
+CSV_PATH = Path(__file__).resolve().parents[1] / 'dataset' / 'zomato.csv'
+
+
+def _raw_rows( cost, votes ):
+    n = len(cost)
+    return pd.DataFrame({'Restaurant ID': np.arange(n), 'Restaurant Name': ['x'] * n, 'Country Code': [1] * n,
+                         'Rating color': ['3F7E00'] * n, 'Latitude': [0.0] * n, 'Longitude': [0.0] * n,
+                         'Average Cost for two': cost, 'Aggregate rating': [4.0] * n, 'Votes': votes,
+                         'Price range': [2] * n})
+
+
+def test_missing_or_non_numeric_cost_and_votes_are_quarantined():
+    df = _raw_rows(cost=[100, np.nan, 'abc', -1, 0], votes=[10, 5, 5, 5, 0])
+    linhas_validas, quarantine, counts = validate_rows(coerce_numeric(df), RULES, df)
+
+    assert linhas_validas.tolist() == [True, False, False, False, True]
+    assert counts['custo_negativo'] == 3
+
+    df = _raw_rows(cost=[100] * 4, votes=[10, None, 'n/a', -3])
+    linhas_validas, quarantine, counts = validate_rows(coerce_numeric(df), RULES, df)
+
+    assert linhas_validas.tolist() == [True, False, False, False]
+    assert counts['votos_negativos'] == 3
+
+
+def _publish_with_bad_cell( tmp_path, col, value, row=5 ):
+    # Importa os módulos que registram artefatos: a ingestão gera todos eles, como na linha de comando
+    from utils import dataset, hexbin, ranking, search, similarity, table  # noqa: F401
+
+    raw = pd.read_csv(CSV_PATH, dtype=str).head(600)
+    raw.loc[row, col] = value
+    raw.to_csv(tmp_path / 'zomato.csv', index=False)
+    dataset.publish_dataset(str(tmp_path / 'zomato.csv'), str(tmp_path / 'published'))
+
+    pointer = dataset._read_pointer(str(tmp_path / 'published'))
+    _, df1 = dataset.attach_dataset(str(tmp_path / 'published' / pointer['file']))
+    quarantine = pd.read_csv(tmp_path / 'published' / 'validation-1' / 'quarantine.csv', dtype=str)
+
+    return pointer, df1, quarantine
+
+
+@pytest.mark.parametrize('col, rule', [('Country Code', 'pais_desconhecido'), ('Price range', 'faixa_de_preco_invalida')])
+def test_non_numeric_code_quarantines_only_its_row( tmp_path, col, rule ):
+    pointer, df1, quarantine = _publish_with_bad_cell(tmp_path, col, 'x')
+
+    assert pointer['quarantined'] == 1
+    assert quarantine[col].tolist() == ['x']
+    assert quarantine['Motivos'].tolist() == [rule]
+    assert pointer['rows'] > 0
+    assert df1[col].dtype == np.int64
+
+
+def test_non_numeric_cost_is_quarantined_and_publish_succeeds( tmp_path ):
+    pointer, df1, quarantine = _publish_with_bad_cell(tmp_path, 'Average Cost for two', 'abc')
+
+    assert pointer['quarantined'] == 1
+    assert quarantine['Average Cost for two'].tolist() == ['abc']
+    assert df1['Average Cost for two'].dtype == np.int64
+    assert (df1['Average Cost for two'] != 0).all()
@@ -0,0 +1,475 @@
+# Bibliotecas
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import threading
+import weakref
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.schema import CATEGORY_COLUMNS, validate_columns
+from utils.validation import build_rules, coerce_numeric, restore_integers, validate_rows, write_quarantine
+
+
+# =======================================================================================================================
+# Dataset compartilhado entre os processos do servidor
+# =======================================================================================================================
+# A ingestão limpa o CSV uma única vez e publica o resultado como um arquivo Arrow IPC (colunar, sem compressão)
+# em PUBLISH_DIR. Cada versão publicada tem o seu próprio arquivo e o ponteiro CURRENT indica a versão vigente.
+# Os processos do Streamlit mapeiam o arquivo em memória (mmap, somente leitura), de modo que as páginas do
+# arquivo ficam no page cache do sistema operacional e são compartilhadas por todos os processos do host.
+CSV_PATH = 'dataset/zomato.csv'
+PUBLISH_DIR = 'dataset/published'
+POINTER_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+VERSION_KEY = b'fome_zero.version'
+KEEP_VERSIONS = 2
+WARMUP_THREAD = 'fome_zero_warmup'
+
+# Artefatos derivados de cada versão (índices, agregados pré-calculados). Cada módulo registra a função que
+# gera o seu artefato com register_artifact(); a ingestão gera todos eles em '<nome>-<versão>/' ao lado do
+# arquivo Arrow, antes de trocar o ponteiro CURRENT.
+ARTIFACTS = {}
+
+# Aquecimento de cada nova versão neste processo (utils/warmup.py): funções warm(versão, Dataframe) executadas
+# numa thread em segundo plano antes de a versão passar a ser servida. Enquanto isso as sessões continuam
+# recebendo a versão anterior.
+WARMERS = []
+
+# Dataframes compartilhados deste processo (o anexado de cada versão e as suas visões só de metadados), pela
+# identidade do objeto: id -> (referência fraca, versão). O agendador (utils/scheduler.py) identifica esses
+# Dataframes pela versão, sem ler o conteúdo.
+_SHARED_FRAMES = {}
+
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America",
+    }
+
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+    }
+
+# Regras da validação da ingestão (utils/validation.py)
+RULES = build_rules(COUNTRIES, COLORS)
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def clean_code( df, linhas_validas=None ):
+    """ Esta função tem a responsabilidade de limpar o dataframe
+
+        Tipos de limpeza:
+        1. Remoção das colunas do Dataframe que apresentam valores únicos e que não serão utilizadas
+        2. Mudança do tipo da coluna de dados
+        3. Categorização dos tipos de culinárias
+        4. Remoção das informações duplicadas
+        5. Preenchimento do nome dos países
+        6. Remoção dos restaurantes com a informação de preço para dois zerado
+
+        As linhas mantidas são decididas primeiro (máscaras) e o Dataframe final é materializado uma única
+        vez; as colunas derivadas são calculadas somente sobre as linhas mantidas.
+
+        Input: Dataframe (colunas numéricas convertidas com coerce_numeric), máscara das linhas aprovadas na
+               validação (opcional)
+        Output: Dataframe
+    """
+    # 1.Colunas do Dataframe que serão utilizadas
+    cols = [col for col in df.columns if col != 'Switch to order menu']
+
+    # 4.Removendo as informações duplicadas e 6.os restaurantes com preço para dois = 0
+    linhas_selecionadas = ~df.duplicated(subset=cols) & (df['Average Cost for two'] != 0)
+    if linhas_validas is not None:
+        linhas_selecionadas &= linhas_validas
+
+    # Única materialização do Dataframe limpo
+    df1 = df.loc[linhas_selecionadas, cols]
+    df1.insert(0, 'index', df.index[linhas_selecionadas])
+    df1.index = pd.RangeIndex(len(df1))
+    restore_integers(df1)
+
+    # 2.Alteração do tipo de dados para String
+    df1['Cuisines'] = df1['Cuisines'].astype( str )
+
+    # 3.Mantendo somente um tipo de culinária por restaunte
+    df1['Cuisines_categories'] = df1['Cuisines'].str.split(',', n=1).str[0]
+
+    # 5.Preenchimento do nome dos países
+    df1['Country Name'] = df1['Country Code'].map(COUNTRIES)
+
+    return df1
+
+
+@contextmanager
+def _publish_lock( publish_dir ):
+    """ Lock exclusivo entre processos para publicar uma nova versão """
+    os.makedirs(publish_dir, exist_ok=True)
+    with open(os.path.join(publish_dir, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_pointer( publish_dir ):
+    """ Lê o ponteiro CURRENT. Retorna None se nenhuma versão foi publicada ainda """
+    try:
+        with open(os.path.join(publish_dir, POINTER_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic( path, data ):
+    """ Escreve o arquivo num temporário e troca pelo definitivo com os.replace (atômico no mesmo filesystem) """
+    tmp = f'{path}.tmp.{os.getpid()}'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _prune_versions( publish_dir, keep ):
+    """ Remove os arquivos e artefatos das versões antigas. Processos que ainda mapeiam um arquivo removido
+        continuam lendo normalmente até trocarem de versão (o inode só é liberado quando o último mmap é fechado).
+    """
+    versions = sorted(int(f[len('zomato-'):-len('.arrow')]) for f in os.listdir(publish_dir)
+                      if f.startswith('zomato-') and f.endswith('.arrow'))
+    for version in versions[:-keep]:
+        os.remove(os.path.join(publish_dir, f'zomato-{version}.arrow'))
+        for name in os.listdir(publish_dir):
+            if name.endswith(f'-{version}') and os.path.isdir(os.path.join(publish_dir, name)):
+                shutil.rmtree(os.path.join(publish_dir, name))
+
+
+def register_artifact( name, build ):
+    """ Registra um artefato derivado do dataset
+
+        Input: nome do artefato, função build(df1, diretório) que grava os arquivos do artefato no diretório
+    """
+    ARTIFACTS[name] = build
+
+
+def register_warmer( warm ):
+    """ Registra uma função de aquecimento do processo
+
+        Input: função warm(versão, Dataframe), executada em segundo plano para cada nova versão anexada
+    """
+    if warm not in WARMERS:
+        WARMERS.append(warm)
+
+
+def _build_artifact( publish_dir, name, version, df1 ):
+    """ Gera o artefato num diretório temporário e o renomeia para o definitivo (atômico) """
+    directory = os.path.join(publish_dir, f'{name}-{version}')
+    tmp = f'{directory}.tmp.{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    ARTIFACTS[name](df1, tmp)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.rename(tmp, directory)
+
+    return directory
+
+
+def publish_dataset( csv_path=CSV_PATH, publish_dir=PUBLISH_DIR, only_if_missing=False ):
+    """ Ingestão: limpa o CSV e publica uma nova versão do dataset para todos os processos do host
+
+        O arquivo Arrow leva a versão no metadado do schema (cabeçalho) e o ponteiro CURRENT só é trocado
+        depois que o arquivo está completo no disco, então os leitores nunca enxergam uma versão parcial.
+
+        Input: caminho do CSV, diretório de publicação, only_if_missing (não publica se já existe uma versão)
+        Output: número da versão publicada
+    """
+    with _publish_lock(publish_dir):
+        pointer = _read_pointer(publish_dir)
+        if only_if_missing and pointer:
+            return pointer['version']
+
+        version = pointer['version'] + 1 if pointer else 1
+        filename = f'zomato-{version}.arrow'
+
+        # Validação vetorizada: as linhas inválidas vão para a quarentena em vez de derrubar a ingestão
+        raw = pd.read_csv( csv_path )
+        df = coerce_numeric(raw)
+        linhas_validas, quarantine, counts = validate_rows(df, RULES, raw)
+        directory = os.path.join(publish_dir, f'validation-{version}')
+        os.makedirs(directory, exist_ok=True)
+        write_quarantine(quarantine, counts, directory)
+        print(f'Validação: {len(quarantine)} linhas em quarentena {counts}')
+
+        df1 = clean_code( df, linhas_validas )
+
+        # Colunas de poucos valores distintos vão como dicionário, com as categorias em ordem alfabética para que
+        # os agrupamentos das páginas continuem ordenados como eram as colunas de texto
+        categories = {col: pd.CategoricalDtype(sorted(df1[col].dropna().unique())) for col in CATEGORY_COLUMNS}
+        table = pa.Table.from_pandas(df1.astype(categories), preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), VERSION_KEY: str(version).encode()})
+
+        path = os.path.join(publish_dir, filename)
+        tmp = f'{path}.tmp.{os.getpid()}'
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+        for name in ARTIFACTS:
+            _build_artifact(publish_dir, name, version, df1)
+
+        pointer = {'version': version, 'file': filename, 'rows': table.num_rows, 'quarantined': len(quarantine)}
+        _write_atomic(os.path.join(publish_dir, POINTER_FILE), json.dumps(pointer).encode())
+
+        _prune_versions(publish_dir, KEEP_VERSIONS)
+
+    return version
+
+
+def _arrow_strings( arrow_type ):
+    """ Texto livre do arquivo Arrow como string[pyarrow] no pandas; os demais tipos seguem a conversão padrão """
+    return pd.StringDtype('pyarrow') if arrow_type == pa.string() else None
+
+
+def attach_dataset( path ):
+    """ Mapeia o arquivo publicado em memória e monta o DataFrame sem copiar as colunas numéricas
+
+        As colunas numéricas sem nulos apontam diretamente para o mmap (somente leitura). As colunas gravadas
+        como dicionário viram Categorical (códigos inteiros e um dicionário pequeno por processo) e as de texto
+        livre viram strings do Arrow, cujos buffers continuam no mmap: nenhuma coluna de texto é materializada
+        como objetos Python.
+
+        Input: caminho do arquivo Arrow
+        Output: (versão do cabeçalho, Dataframe). Levanta ValueError se faltar alguma coluna do schema
+    """
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    version = int(table.schema.metadata[VERSION_KEY])
+    df1 = table.to_pandas(split_blocks=True, self_destruct=False, types_mapper=_arrow_strings)
+    validate_columns(df1)
+
+    return version, share_frame(df1, version)
+
+
+def share_frame( frame, version ):
+    """ Registra o Dataframe como o dataset compartilhado da versão (ou uma visão dele que só troca metadados,
+        como rename_columns) e o devolve
+
+        Input: Dataframe, versão do dataset
+        Output: o mesmo Dataframe
+    """
+    key = id(frame)
+    _SHARED_FRAMES[key] = (weakref.ref(frame, lambda _: _SHARED_FRAMES.pop(key, None)), version)
+
+    return frame
+
+
+def shared_version( frame ):
+    """ Versão do dataset se `frame` é um Dataframe registrado com share_frame(); None para qualquer outro
+        objeto, inclusive recortes e cópias do dataset
+    """
+    entry = _SHARED_FRAMES.get(id(frame))
+    if entry is None or entry[0]() is not frame:
+        return None
+
+    return entry[1]
+
+
+class _SharedDataset:
+    """ Versão do dataset anexada neste processo. A troca de versão é feita sob lock e de forma atômica:
+        quem já recebeu o DataFrame antigo continua com ele até o fim do rerun.
+
+        Uma nova versão publicada é anexada e aquecida (WARMERS) numa thread em segundo plano, e só então
+        passa a ser a versão servida. Somente o primeiro acesso do processo, quando ainda não há versão
+        nenhuma para servir, espera a anexação.
+    """
+    def __init__( self ):
+        self.lock = threading.Lock()
+        self.pointer_mtime = None
+        self.current = (None, None)
+        self.warming = None
+        self.ready = threading.Event()
+        # Na thread de aquecimento current_dataset() devolve a versão que está sendo aquecida
+        self.local = threading.local()
+
+    def _warm( self, version, df1, mtime ):
+        """ Executa os aquecimentos da versão e passa a servi-la (mesmo que algum aquecimento falhe) """
+        self.local.current = (version, df1)
+        try:
+            for warm in list(WARMERS):
+                try:
+                    warm(version, df1)
+                except Exception as error:
+                    print(f'[aquecimento] versão {version}: {warm.__module__}.{warm.__name__} falhou: {error!r}')
+        finally:
+            self.local.current = None
+            with self.lock:
+                if self.current[0] is None or self.current[0] < version:
+                    self.current = (version, df1)
+                    self.pointer_mtime = mtime
+                self.warming = None
+                self.ready.set()
+
+    def _attach_and_warm( self, pointer, path, mtime ):
+        try:
+            version, df1 = attach_dataset(path)
+            if version != pointer['version']:
+                raise RuntimeError(f'Versão do arquivo ({version}) diferente do ponteiro ({pointer["version"]})')
+        except Exception as error:
+            print(f'[aquecimento] versão {pointer["version"]} não anexada: {error!r}')
+            # Continua servindo a versão atual; uma nova tentativa só acontece quando o ponteiro mudar de novo
+            with self.lock:
+                self.pointer_mtime = mtime
+                self.warming = None
+                self.ready.set()
+            return None
+
+        self._warm(version, df1, mtime)
+
+    def get( self, publish_dir=PUBLISH_DIR ):
+        override = getattr(self.local, 'current', None)
+        if override is not None:
+            return override
+
+        pointer_path = os.path.join(publish_dir, POINTER_FILE)
+        try:
+            mtime = os.stat(pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        current = self.current
+        if current[1] is not None and mtime == self.pointer_mtime:
+            return current
+
+        with self.lock:
+            if mtime is None:
+                # Primeiro processo do host: publica a versão inicial
+                publish_dataset(publish_dir=publish_dir, only_if_missing=True)
+                mtime = os.stat(pointer_path).st_mtime_ns
+
+            pointer = _read_pointer(publish_dir)
+            path = os.path.join(publish_dir, pointer['file'])
+            if self.current[1] is None:
+                # Processo sem versão nenhuma: anexa agora e aquece em segundo plano
+                version, df1 = attach_dataset(path)
+                if version != pointer['version']:
+                    raise RuntimeError(f'Versão do arquivo ({version}) diferente do ponteiro ({pointer["version"]})')
+                self.current = (version, df1)
+                self.pointer_mtime = mtime
+                self.warming = version
+                self.ready.clear()
+                threading.Thread(target=self._warm, args=(version, df1, mtime), name=WARMUP_THREAD, daemon=True).start()
+            elif self.current[0] == pointer['version']:
+                self.pointer_mtime = mtime
+            elif self.warming is None:
+                # Nova versão publicada: as sessões recebem a versão atual até o aquecimento da nova terminar
+                self.warming = pointer['version']
+                self.ready.clear()
+                threading.Thread(target=self._attach_and_warm, args=(pointer, path, mtime), name=WARMUP_THREAD,
+                                 daemon=True).start()
+
+        return self.current
+
+
+_DATASET = _SharedDataset()
+
+
+def current_dataset( publish_dir=PUBLISH_DIR ):
+    """ Retorna a versão vigente e o dataset limpo correspondente (anexado uma vez por processo)
+
+        Output: (versão, Dataframe). Use a mesma versão para carregar os artefatos derivados do Dataframe
+    """
+    return _DATASET.get(publish_dir)
+
+
+def warmup_status():
+    """ Estado do aquecimento neste processo
+
+        Output: dicionário com a versão servida ('version') e a versão em aquecimento ('warming', ou None)
+    """
+    return {'version': _DATASET.current[0], 'warming': _DATASET.warming}
+
+
+def wait_warmup( timeout=None ):
+    """ Espera o aquecimento em andamento terminar. Retorna False se o tempo acabar antes """
+    return _DATASET.ready.wait(timeout)
+
+
+def artifact_dir( name, version, df1, publish_dir=PUBLISH_DIR ):
+    """ Diretório do artefato de uma versão do dataset
+
+        Normalmente o artefato já foi gerado na ingestão. Se faltar (versão publicada antes de o artefato
+        existir), ele é gerado aqui, sob o lock de publicação, e fica disponível para os outros processos.
+
+        Input: nome do artefato, versão e Dataframe dessa versão
+        Output: caminho do diretório
+    """
+    directory = os.path.join(publish_dir, f'{name}-{version}')
+    if not os.path.isdir(directory):
+        with _publish_lock(publish_dir):
+            if not os.path.isdir(directory):
+                _build_artifact(publish_dir, name, version, df1)
+
+    return directory
+
+
+# Artefatos carregados neste processo: nome -> (lock, {versão: objeto}). Cada artefato tem o seu lock, então a
+# geração tardia de um deles não bloqueia o carregamento dos outros.
+_LOADED = {}
+_LOADED_LOCK = threading.Lock()
+
+
+def load_artifact( name, version, df1, factory ):
+    """ Retorna o artefato da versão carregado neste processo, criado uma única vez com factory(diretório)
+
+        Guarda no máximo KEEP_VERSIONS versões de cada artefato: a versão servida e a que está sendo aquecida.
+
+        Input: nome do artefato, versão e Dataframe dessa versão, função que carrega o diretório do artefato
+        Output: objeto devolvido por factory
+    """
+    with _LOADED_LOCK:
+        lock, loaded = _LOADED.setdefault(name, (threading.Lock(), {}))
+
+    with lock:
+        if version not in loaded:
+            while len(loaded) >= KEEP_VERSIONS:
+                del loaded[min(loaded)]
+            loaded[version] = factory(artifact_dir(name, version, df1))
+
+        return loaded[version]
+
+
+# ================================ Ingestão pela linha de comando ========================================================
+if __name__ == '__main__':
+    # Importa os módulos que registram artefatos na instância importável deste módulo (e não em __main__)
+    from utils import dataset, hexbin, ranking, search, similarity, table
+
+    parser = argparse.ArgumentParser(description='Publica uma nova versão do dataset limpo para os processos do host')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--publish-dir', default=PUBLISH_DIR)
+    args = parser.parse_args()
+
+    print(f'Versão publicada: {dataset.publish_dataset(args.csv, args.publish_dir)}')
@@ -0,0 +1,134 @@
+# Bibliotecas
+import io
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.schema import COLUMNS
+
+
+# =======================================================================================================================
+# Exportação das linhas filtradas
+# =======================================================================================================================
+# As linhas são lidas do dataset compartilhado em blocos a partir do índice do filtro: nenhum segundo Dataframe
+# completo é criado, só um bloco de CHUNK_ROWS linhas por vez. A exportação tem um teto de linhas e um tempo
+# máximo para não prender o worker que também atende as outras sessões.
+MAX_EXPORT_ROWS = 200_000
+CHUNK_ROWS = 20_000
+TIME_BUDGET = 10.0
+EXPORT_COLUMNS = [col for col in COLUMNS if col != 'index']
+FORMATS = {
+    'CSV': ('text/csv', 'csv'),
+    'Parquet': ('application/octet-stream', 'parquet'),
+    }
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def iter_chunks( df1, rows, cols, chunk_rows=CHUNK_ROWS ):
+    """ Gera os blocos das linhas selecionadas, um Dataframe pequeno por vez
+
+        Input: Dataframe, posições das linhas, colunas
+    """
+    for start in range(0, len(rows), chunk_rows):
+        yield df1.iloc[rows[start:start + chunk_rows]][cols]
+
+
+def export_rows( df1, rows, cols, file_format='CSV', max_rows=MAX_EXPORT_ROWS, time_budget=TIME_BUDGET ):
+    """ Serializa as linhas selecionadas em CSV ou Parquet, bloco a bloco
+
+        Input: Dataframe, posições das linhas, colunas, formato, teto de linhas, tempo máximo em segundos
+        Output: dicionário com os bytes do arquivo, linhas exportadas, tempo em ms e o motivo do corte (ou None)
+    """
+    rows = np.asarray(rows)
+    truncated = None
+    if len(rows) > max_rows:
+        rows = rows[:max_rows]
+        truncated = f'limite de {max_rows} linhas'
+
+    start = time.perf_counter()
+    sink = io.BytesIO()
+    writer = None
+    written = 0
+    for chunk in iter_chunks(df1, rows, cols):
+        if file_format == 'CSV':
+            chunk.to_csv(sink, header=(written == 0), index=False)
+        else:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table)
+        written += len(chunk)
+
+        if time.perf_counter() - start > time_budget and written < len(rows):
+            truncated = f'tempo máximo de {time_budget:.0f} s'
+            break
+
+        # Devolve o GIL entre os blocos para as outras sessões do processo
+        time.sleep(0)
+
+    if file_format == 'CSV':
+        if written == 0:
+            # Seleção vazia: o arquivo ainda tem o cabeçalho, como o Parquet tem o schema
+            df1.iloc[:0][cols].to_csv(sink, index=False)
+    else:
+        if writer is None:
+            writer = pq.ParquetWriter(sink, pa.Schema.from_pandas(df1.iloc[:0][cols], preserve_index=False))
+        writer.close()
+
+    # Uma única cópia do arquivo: os bytes saem da view do buffer e o BytesIO é liberado em seguida
+    with sink.getbuffer() as view:
+        data = bytes(view)
+    sink.close()
+
+    return {'data': data,
+            'rows': written,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'truncated': truncated}
+
+
+def _discard_export( key ):
+    """ Descarta da sessão o arquivo preparado (chamada no clique do download) """
+    st.session_state.pop(f'{key}_export', None)
+
+
+def export_panel( df1, selections, cols, key ):
+    """ Painel de exportação da página
+
+        A exportação só é gerada quando o usuário pede e fica guardada na sessão até o download ou até a
+        seleção mudar, então os reruns causados por outros widgets não serializam os dados de novo e os bytes
+        não ficam na sessão depois de usados.
+
+        Input: Dataframe, dicionário {nome da seleção: posições das linhas}, colunas, chave única da página
+    """
+    with st.expander('Exportar dados'):
+        selection = st.radio('Linhas', list(selections), key=f'{key}_selection', horizontal=True)
+        file_format = st.radio('Formato', list(FORMATS), key=f'{key}_format', horizontal=True)
+        rows = np.asarray(selections[selection])
+        signature = (selection, file_format, len(rows), hash(rows.tobytes()))
+
+        st.caption(f'{len(rows)} linhas selecionadas (máximo de {MAX_EXPORT_ROWS} por exportação)')
+
+        if st.button('Preparar exportação', key=f'{key}_prepare'):
+            st.session_state[f'{key}_export'] = (signature, export_rows(df1, rows, cols, file_format))
+
+        exported = st.session_state.get(f'{key}_export')
+        if exported is not None and exported[0] != signature:
+            # Seleção ou formato mudou: o arquivo preparado antes não vale mais
+            del st.session_state[f'{key}_export']
+        elif exported is not None:
+            result = exported[1]
+            message = f'{result["rows"]} linhas exportadas em {result["elapsed_ms"]:.0f} ms'
+            if result['truncated']:
+                message += f' (interrompida: {result["truncated"]})'
+            st.caption(message)
+
+            mime, extension = FORMATS[file_format]
+            st.download_button('Baixar arquivo', data=result['data'], file_name=f'{key}.{extension}', mime=mime,
+                               key=f'{key}_download', on_click=_discard_export, args=(key,))
+
+    return None
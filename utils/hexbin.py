@@ -0,0 +1,131 @@
+# Bibliotecas
+import os
+
+import numpy as np
+
+from utils.dataset import COUNTRIES, load_artifact, register_artifact
+
+
+# =======================================================================================================================
+# Mapa de densidade em hexágonos
+# =======================================================================================================================
+# Latitude/Longitude são agrupadas em hexágonos (orientação "pointy-top", coordenadas axiais q/r) com o lado
+# em graus definido por resolução. Os agregados de cada hexágono (quantidade, avaliação média e custo médio)
+# são calculados uma vez por versão do dataset, separados por país para que o filtro da barra lateral seja
+# só uma máscara sobre as células. O mapa desenha uma camada de polígonos com uma feição por célula ocupada.
+RESOLUTIONS = {
+    'Bairro (~1 km)': 0.01,
+    'Cidade (~5 km)': 0.05,
+    'Região (~25 km)': 0.25,
+    }
+SQRT3 = np.sqrt(3)
+FIELDS = ['country', 'q', 'r', 'count', 'rating', 'cost']
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def hex_cells( latitude, longitude, size ):
+    """ Converte pontos em coordenadas axiais (q, r) do hexágono que os contém (vetorizado)
+
+        Input: arrays de latitude e longitude, lado do hexágono em graus
+        Output: arrays inteiros q, r
+    """
+    x = np.asarray(longitude, dtype=np.float64) / size
+    y = np.asarray(latitude, dtype=np.float64) / size
+    q = SQRT3 / 3 * x - y / 3
+    r = 2 / 3 * y
+
+    # Arredondamento em coordenadas cúbicas (q + r + s = 0): corrige o eixo com o maior erro
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_polygons( q, r, size ):
+    """ Vértices (longitude, latitude) dos hexágonos. Output: array (n, 7, 2), o primeiro vértice repetido no fim """
+    cx = size * (SQRT3 * q + SQRT3 / 2 * r)
+    cy = size * 1.5 * r
+    angles = np.deg2rad(30 + 60 * np.arange(7))
+    lon = cx[:, None] + size * np.cos(angles)[None, :]
+    lat = cy[:, None] + size * np.sin(angles)[None, :]
+
+    return np.stack([lon, lat], axis=-1)
+
+
+def aggregate_cells( df1, size ):
+    """ Agregados por (país, hexágono) numa única passada
+
+        Input: Dataframe limpo, lado do hexágono em graus
+        Output: dicionário de arrays com país, q, r, quantidade, avaliação média e custo médio por célula
+    """
+    q, r = hex_cells(df1['Latitude'].to_numpy(), df1['Longitude'].to_numpy(), size)
+    country = df1['Country Code'].to_numpy().astype(np.int64)
+
+    keys = np.stack([country, q, r], axis=1)
+    cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    count = np.bincount(inverse, minlength=len(cells))
+    rating = np.bincount(inverse, weights=df1['Aggregate rating'].to_numpy(), minlength=len(cells)) / count
+    cost = np.bincount(inverse, weights=df1['Average Cost for two'].to_numpy(), minlength=len(cells)) / count
+
+    return {'country': cells[:, 0], 'q': cells[:, 1], 'r': cells[:, 2], 'count': count, 'rating': rating, 'cost': cost}
+
+
+def build_hexbins( df1, directory ):
+    """ Gera os agregados de todas as resoluções na ingestão
+
+        Input: Dataframe limpo, diretório do artefato
+    """
+    for i, size in enumerate(RESOLUTIONS.values()):
+        cells = aggregate_cells(df1, size)
+        for field in FIELDS:
+            np.save(os.path.join(directory, f'{i}_{field}.npy'), cells[field])
+
+    return None
+
+
+register_artifact('hexbin', build_hexbins)
+
+
+class HexBins:
+    """ Células de todas as resoluções de uma versão do dataset
+
+        Input: diretório do artefato
+    """
+    def __init__( self, directory ):
+        self.cells = {name: {field: np.load(os.path.join(directory, f'{i}_{field}.npy'), mmap_mode='r') for field in FIELDS}
+                      for i, name in enumerate(RESOLUTIONS)}
+
+    def geojson( self, resolution, countries ):
+        """ FeatureCollection com os hexágonos ocupados dos países selecionados
+
+            Input: nome da resolução, lista de nomes dos países
+            Output: (dicionário GeoJSON, quantidade máxima de restaurantes numa célula)
+        """
+        cells = self.cells[resolution]
+        codes = [code for code, name in COUNTRIES.items() if name in countries]
+        selected = np.flatnonzero(np.isin(cells['country'], codes))
+
+        polygons = hex_polygons(cells['q'][selected], cells['r'][selected], RESOLUTIONS[resolution]).round(5).tolist()
+        features = [{'type': 'Feature',
+                     'geometry': {'type': 'Polygon', 'coordinates': [polygon]},
+                     'properties': {'count': int(count), 'rating': round(float(rating), 2), 'cost': round(float(cost), 2)}}
+                    for polygon, count, rating, cost in zip(polygons,
+                                                            cells['count'][selected],
+                                                            cells['rating'][selected],
+                                                            cells['cost'][selected])]
+        max_count = int(cells['count'][selected].max()) if len(selected) else 0
+
+        return {'type': 'FeatureCollection', 'features': features}, max_count
+
+
+def load_hexbins( version, df1 ):
+    """ Retorna as células hexagonais da versão do dataset (carregadas uma vez por processo) """
+    return load_artifact('hexbin', version, df1, HexBins)
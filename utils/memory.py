@@ -0,0 +1,53 @@
+# Bibliotecas
+import os
+import time
+import tracemalloc
+
+import streamlit as st
+
+
+# =======================================================================================================================
+# Relatório de pico de memória por página
+# =======================================================================================================================
+# O tracemalloc deixa todas as alocações do processo mais lentas, então o relatório só é ativado com a variável
+# de ambiente FOME_ZERO_TRACE_MEMORY=1. Os buffers do dataset mapeados em memória (utils/dataset.py) não passam
+# pelo alocador do Python e não entram na conta: o relatório mede somente as cópias transitórias da página.
+TRACE_MEMORY = os.environ.get('FOME_ZERO_TRACE_MEMORY') == '1'
+
+
+class MemoryReport:
+    """ Mede o pico de memória alocada durante a execução de uma página
+
+        O tracemalloc é global ao processo: com várias sessões simultâneas o pico inclui as alocações das
+        outras sessões. Para comparar versões do código, meça com uma única sessão aberta.
+
+        Input: nome da página
+    """
+    def __init__( self, page ):
+        self.page = page
+        self.enabled = TRACE_MEMORY
+        self._baseline = 0
+        self._started = None
+
+        if self.enabled:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+            self._started = time.perf_counter()
+
+    def peak_mb( self ):
+        """ Pico de memória alocada desde o início da página, em MB """
+        return (tracemalloc.get_traced_memory()[1] - self._baseline) / 2**20
+
+    def report( self ):
+        """ Escreve o pico de memória na barra lateral e no log do servidor """
+        if not self.enabled:
+            return None
+
+        peak = self.peak_mb()
+        elapsed = (time.perf_counter() - self._started) * 1000
+        print(f'[memória] {self.page}: pico de {peak:.2f} MB em {elapsed:.0f} ms')
+        st.sidebar.caption(f'Pico de memória da página: {peak:.2f} MB')
+
+        return None
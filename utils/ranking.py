@@ -0,0 +1,95 @@
+# Bibliotecas
+import json
+import os
+
+import numpy as np
+
+from utils.dataset import load_artifact, register_artifact
+
+
+# =======================================================================================================================
+# Ranking ponderado pela quantidade de votos
+# =======================================================================================================================
+# Média bayesiana: score = v / (v + m) * R + m / (v + m) * C, onde R é a avaliação do restaurante, v os votos,
+# C a avaliação média da base e m o peso da média da base (em votos). Com poucos votos o score fica perto de C;
+# com muitos votos fica perto de R. Assim um 4.9 com 3 votos não passa mais um 4.8 com 3.000 votos.
+# O score é calculado uma vez por versão do dataset, na ingestão.
+PRIOR_VOTES_QUANTILE = 0.5
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def weighted_rating( rating, votes, prior_votes, prior_rating ):
+    """ Média bayesiana da avaliação (vetorizada) """
+    rating = np.asarray(rating, dtype=np.float64)
+    votes = np.asarray(votes, dtype=np.float64)
+
+    return (votes * rating + prior_votes * prior_rating) / (votes + prior_votes)
+
+
+def build_ranking( df1, directory ):
+    """ Calcula o score de todos os restaurantes na ingestão
+
+        Input: Dataframe limpo, diretório do artefato
+    """
+    rating = df1['Aggregate rating'].to_numpy(dtype=np.float64)
+    votes = df1['Votes'].to_numpy(dtype=np.float64)
+
+    rated = votes > 0
+    prior_rating = float(rating[rated].mean()) if rated.any() else 0.0
+    prior_votes = float(max(np.quantile(votes[rated], PRIOR_VOTES_QUANTILE), 1.0)) if rated.any() else 1.0
+
+    np.save(os.path.join(directory, 'score.npy'), weighted_rating(rating, votes, prior_votes, prior_rating))
+    with open(os.path.join(directory, 'prior.json'), 'w') as f:
+        json.dump({'prior_votes': prior_votes, 'prior_rating': prior_rating}, f)
+
+    return None
+
+
+register_artifact('ranking', build_ranking)
+
+
+def top_k( score, rows, k, tiebreak=None ):
+    """ As k linhas de maior score entre as linhas selecionadas, por seleção parcial
+
+        np.argpartition separa as k maiores em O(n); só essas k são ordenadas (O(k log k)), em vez de ordenar
+        toda a seleção. As linhas empatadas com a k-ésima entram todas na ordenação, para que o desempate
+        escolha entre elas e não a ordem arbitrária da partição.
+
+        Input: array de score, posições das linhas selecionadas, k, array de desempate crescente (opcional)
+        Output: posições das k linhas, em ordem decrescente de score
+    """
+    rows = np.asarray(rows)
+    k = min(k, len(rows))
+    if k <= 0:
+        return rows[:0]
+
+    candidates = rows
+    if k < len(rows):
+        selected = score[rows]
+        kth = selected[np.argpartition(-selected, k - 1)[k - 1]]
+        candidates = rows[selected >= kth]
+
+    # Ordena só os candidatos: score decrescente e, no empate, o desempate crescente (np.lexsort usa a última
+    # chave primeiro), e corta em k
+    keys = (-score[candidates],) if tiebreak is None else (tiebreak[candidates], -score[candidates])
+
+    return candidates[np.lexsort(keys)][:k]
+
+
+class Ranking:
+    """ Score ponderado de uma versão do dataset, mapeado em memória
+
+        Input: diretório do artefato
+    """
+    def __init__( self, directory ):
+        self.score = np.load(os.path.join(directory, 'score.npy'), mmap_mode='r')
+
+    def top( self, rows, k, tiebreak=None ):
+        return top_k(self.score, rows, k, tiebreak)
+
+
+def load_ranking( version, df1 ):
+    """ Retorna o ranking da versão do dataset (carregado uma vez por processo) """
+    return load_artifact('ranking', version, df1, Ranking)
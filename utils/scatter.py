@@ -0,0 +1,82 @@
+# Bibliotecas
+import numpy as np
+
+
+# =======================================================================================================================
+# Redução de pontos para os gráficos de dispersão
+# =======================================================================================================================
+# O navegador recebe no máximo POINT_BUDGET pontos, qualquer que seja a seleção. Até esse limite todos os pontos
+# são enviados. Acima dele, o gráfico mostra uma amostra estratificada e, ao fundo, um mapa de calor com a
+# contagem de todas as linhas em BINS x BINS células.
+#
+# A amostra é estratificada numa grade SAMPLE_GRID x SAMPLE_GRID: cada célula ocupada recebe uma cota
+# proporcional à sua contagem (a densidade relativa das regiões é mantida) e no mínimo um ponto (os valores
+# raros não desaparecem como numa amostra aleatória simples). Se houver mais células ocupadas que pontos no
+# orçamento, as células que recebem um ponto são sorteadas com peso pela contagem, em todo o gráfico. A semente
+# é fixa, então reruns com a mesma seleção mostram os mesmos pontos.
+POINT_BUDGET = 10_000
+MAX_POINT_BUDGET = 20_000
+SAMPLE_GRID = 64
+BINS = (80, 50)
+SEED = 42
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def _grid_cells( x, y, grid ):
+    """ Célula de cada ponto numa grade grid x grid sobre a extensão dos dados """
+    def codes( values ):
+        low, high = values.min(), values.max()
+        scale = grid / (high - low) if high > low else 0.0
+        return np.minimum(((values - low) * scale).astype(np.int64), grid - 1)
+
+    return codes(x) * grid + codes(y)
+
+
+def stratified_sample( x, y, budget=POINT_BUDGET, grid=SAMPLE_GRID, seed=SEED ):
+    """ Amostra de no máximo `budget` pontos que preserva a densidade e mantém os pontos isolados
+
+        Input: arrays x e y (já na escala do gráfico), tamanho máximo da amostra, tamanho da grade, semente
+        Output: posições dos pontos amostrados (em ordem crescente)
+    """
+    n = len(x)
+    if n <= budget:
+        return np.arange(n)
+
+    cells = _grid_cells(x, y, grid)
+    counts = np.bincount(cells, minlength=grid * grid)
+    occupied = np.count_nonzero(counts)
+
+    rng = np.random.default_rng(seed)
+    if occupied > budget:
+        # Mais células ocupadas que pontos: sorteia `budget` células com peso pela contagem, um ponto em cada
+        quota = np.zeros(grid * grid, dtype=np.int64)
+        quota[rng.choice(grid * grid, size=budget, replace=False, p=counts / n)] = 1
+    else:
+        # Um ponto garantido por célula ocupada e o restante do orçamento dividido pela densidade (maiores restos)
+        share = counts * (budget - occupied) / n
+        quota = np.floor(share).astype(np.int64)
+        remainder = budget - occupied - int(quota.sum())
+        if remainder > 0:
+            quota[np.argpartition(quota - share, remainder - 1)[:remainder]] += 1
+        quota = np.where(counts > 0, np.minimum(1 + quota, counts), 0)
+
+    # Sorteio dentro de cada célula: ordem aleatória por célula e as primeiras `quota` posições de cada uma
+    priority = rng.random(n)
+    order = np.argsort(cells + priority)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(n) - starts[cells[order]]
+    keep = order[rank < quota[cells[order]]]
+
+    return np.sort(keep)
+
+
+def binned_counts( x, y, bins=BINS ):
+    """ Contagem das linhas em bins[0] x bins[1] células
+
+        Output: (contagens com shape (bins[1], bins[0]), centros das células em x, centros das células em y)
+    """
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+
+    return counts.T, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
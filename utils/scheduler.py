@@ -0,0 +1,194 @@
+# Bibliotecas
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dataset import shared_version
+
+
+# =======================================================================================================================
+# Pool de threads compartilhado
+# =======================================================================================================================
+# O pool é criado uma única vez por processo do servidor e compartilhado entre todas as sessões e páginas.
+# As agregações do pandas (groupby, sort) liberam o GIL em boa parte do trabalho, então os gráficos de
+# uma mesma página podem ser calculados em paralelo.
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fome_zero_charts')
+
+# Resultados dos gráficos por (página, gráfico, versão do dataset, entradas), compartilhados entre as sessões
+# do processo. O aquecimento (utils/warmup.py) preenche as entradas da seleção padrão de cada página antes de
+# a versão ser servida. Os resultados são somente leitura para as páginas.
+OUTPUT_CACHE_SIZE = 64
+_OUTPUTS = OrderedDict()
+# Chave de cada Dataframe guardado, pela identidade do objeto: um resultado que vira entrada de outro gráfico
+# (ex.: a tabela de resumo de uma página) é identificado pelas entradas que o produziram, sem ler o conteúdo
+_OUTPUT_KEYS = {}
+_OUTPUTS_LOCK = threading.Lock()
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def _timed_call( func, args, kwargs ):
+    """ Executa a função e devolve o resultado junto com os instantes de início e fim (perf_counter) """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    end = time.perf_counter()
+
+    return result, start, end
+
+
+def fingerprint( value ):
+    """ Identificação das entradas de um gráfico
+
+        O Dataframe compartilhado da versão é identificado pela versão e pelas colunas, e um Dataframe guardado
+        no cache de saídas pela chave das entradas que o produziram (ex.: tabela de resumo -> máscara do
+        filtro). Arrays (máscaras de filtro) e os demais Dataframes são identificados pelo conteúdo. Os outros
+        objetos (artefatos) são os da versão do dataset, que já faz parte da chave, e são identificados pelo tipo.
+    """
+    if isinstance(value, np.ndarray):
+        return ('array', value.dtype.str, value.shape, hashlib.blake2b(np.ascontiguousarray(value).data, digest_size=16).digest())
+    if isinstance(value, pd.DataFrame):
+        with _OUTPUTS_LOCK:
+            key = _OUTPUT_KEYS.get(id(value))
+            if key is not None and _OUTPUTS.get(key) is value:
+                return ('output', key)
+        version = shared_version(value)
+        if version is not None:
+            return ('dataset', version, tuple(value.columns))
+        return ('frame', tuple(value.columns), fingerprint(pd.util.hash_pandas_object(value).to_numpy()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(fingerprint(item) for item in value)
+    if value is None or isinstance(value, (str, int, float, bool, np.generic)):
+        return value
+
+    return ('object', type(value).__module__, type(value).__qualname__)
+
+
+class ChartScheduler:
+    """ Agendador dos gráficos de uma página
+
+        Cada gráfico é registrado com submit() na ordem do layout. As agregações são enviadas ao pool
+        compartilhado e result() devolve o resultado de cada gráfico, bloqueando somente até que aquele
+        gráfico específico fique pronto. Assim a página renderiza na ordem do layout à medida que os
+        cálculos terminam.
+
+        No modo serial cada tarefa é executada imediatamente no submit(), reproduzindo o fluxo antigo
+        da página, o que permite comparar o tempo de parede dos dois caminhos.
+
+        Com a versão do dataset informada, os resultados ficam no cache de saídas do processo e um gráfico
+        cujas entradas não mudaram não é recalculado. O ganho do relatório considera só as tarefas calculadas.
+
+        Input: serial (bool), placeholder do Streamlit onde o relatório de tempo é escrito, versão do dataset,
+               use_cache (False calcula todas as tarefas, sem ler o cache de saídas nem as seções guardadas)
+    """
+    def __init__( self, serial=False, placeholder=None, version=None, use_cache=True ):
+        self.serial = serial
+        self.placeholder = placeholder
+        self.version = version
+        self.use_cache = use_cache
+        self._tasks = {}
+        self._keys = {}
+        self._hits = set()
+        self._started = None
+
+    @classmethod
+    def from_sidebar( cls, version=None ):
+        """ Cria o agendador com o painel de tempo de cálculo na barra lateral
+
+            Marcar o cálculo em série é uma medição: nenhum cache é lido e todas as tarefas são calculadas, para
+            comparar o tempo de parede com o do modo paralelo.
+        """
+        with st.sidebar.expander('Tempo de cálculo dos gráficos'):
+            serial = st.checkbox('Calcular os gráficos em série', value=False)
+            placeholder = st.empty()
+
+        return cls(serial=serial, placeholder=placeholder, version=version, use_cache=not serial)
+
+    def submit( self, name, func, *args, **kwargs ):
+        if self._started is None:
+            self._started = time.perf_counter()
+
+        if self.version is not None:
+            key = (func.__code__.co_filename, func.__qualname__, name, self.version,
+                   fingerprint(args), fingerprint(tuple(sorted(kwargs.items()))))
+            with _OUTPUTS_LOCK:
+                if self.use_cache and key in _OUTPUTS:
+                    _OUTPUTS.move_to_end(key)
+                    now = time.perf_counter()
+                    self._tasks[name] = (_OUTPUTS[key], now, now)
+                    self._hits.add(name)
+                    return None
+            self._keys[name] = key
+
+        if self.serial:
+            self._tasks[name] = _timed_call(func, args, kwargs)
+        else:
+            self._tasks[name] = EXECUTOR.submit(_timed_call, func, args, kwargs)
+
+    def _outcome( self, name ):
+        task = self._tasks[name]
+        if isinstance(task, Future):
+            task = task.result()
+            self._tasks[name] = task
+
+        key = self._keys.pop(name, None)
+        if key is not None:
+            with _OUTPUTS_LOCK:
+                _OUTPUTS[key] = task[0]
+                if isinstance(task[0], pd.DataFrame):
+                    _OUTPUT_KEYS[id(task[0])] = key
+                while len(_OUTPUTS) > OUTPUT_CACHE_SIZE:
+                    evicted, output = _OUTPUTS.popitem(last=False)
+                    if _OUTPUT_KEYS.get(id(output)) == evicted:
+                        del _OUTPUT_KEYS[id(output)]
+
+        return task
+
+    def result( self, name ):
+        return self._outcome(name)[0]
+
+    def timings( self ):
+        """ Retorna o tempo de parede e a soma dos tempos das tarefas (equivalente ao caminho serial) em ms
+
+            Só as tarefas calculadas neste rerun entram no tempo de parede, na soma e no ganho; as que vieram
+            do cache aparecem em per_task_ms com 0 ms. Sem nenhuma tarefa calculada o ganho é None.
+        """
+        outcomes = dict(zip(self._tasks, [self._outcome(name) for name in self._tasks]))
+        per_task = {name: (end - start) * 1000 for name, (_, start, end) in outcomes.items()}
+        computed = [name for name in outcomes if name not in self._hits]
+        if not computed:
+            return {'wall_ms': 0.0, 'tasks_ms': 0.0, 'speedup': None, 'per_task_ms': per_task}
+
+        wall = (max(outcomes[name][2] for name in computed) - self._started) * 1000
+        tasks = sum(per_task[name] for name in computed)
+
+        return {'wall_ms': wall,
+                'tasks_ms': tasks,
+                'speedup': tasks / wall if wall > 0 else 1.0,
+                'per_task_ms': per_task}
+
+    def report( self ):
+        """ Escreve o relatório de tempo no painel da barra lateral """
+        if self.placeholder is None:
+            return None
+
+        timing = self.timings()
+        mode = 'série' if self.serial else f'paralelo ({MAX_WORKERS} threads)'
+        lines = [f'**Modo:** {mode}',
+                 f'**Tempo de parede:** {timing["wall_ms"]:.1f} ms',
+                 f'**Soma das tarefas:** {timing["tasks_ms"]:.1f} ms',
+                 f'**Ganho:** {timing["speedup"]:.2f}x' if timing['speedup'] is not None
+                 else '**Ganho:** - (todos os gráficos vieram do cache)',
+                 '']
+        lines += [f'- {name}: ' + ('cache' if name in self._hits else f'{ms:.1f} ms') for name, ms in timing['per_task_ms'].items()]
+        self.placeholder.markdown('\n'.join(lines))
+
+        return None
@@ -0,0 +1,53 @@
+# Bibliotecas
+import inflection
+
+
+# =======================================================================================================================
+# Registro do schema do dataset limpo
+# =======================================================================================================================
+# Colunas do Dataframe publicado por utils/dataset.py, na ordem em que são gravadas
+COLUMNS = ['index', 'Restaurant ID', 'Restaurant Name', 'Country Code', 'City', 'Address', 'Locality',
+           'Locality Verbose', 'Longitude', 'Latitude', 'Cuisines', 'Average Cost for two', 'Currency',
+           'Has Table booking', 'Has Online delivery', 'Is delivering now', 'Price range', 'Aggregate rating',
+           'Rating color', 'Rating text', 'Votes', 'Cuisines_categories', 'Country Name']
+
+# Colunas de texto com poucos valores distintos, gravadas no arquivo Arrow como dicionário (Categorical no pandas).
+# As demais colunas de texto (nome, endereço, culinárias...) são texto livre, lidas como strings do Arrow
+CATEGORY_COLUMNS = ['City', 'Currency', 'Rating color', 'Rating text', 'Cuisines_categories', 'Country Name']
+
+
+# Função que converte o nome original da coluna para snake_case
+def snake_case( column ):
+    column = inflection.titleize(column)
+    column = column.replace(" ", "")
+
+    return inflection.underscore(column)
+
+
+# Mapeamentos calculados uma única vez, na importação do módulo
+COLUMN_MAPPING = {col: snake_case(col) for col in COLUMNS}
+ORIGINAL_COLUMNS = {snake: col for col, snake in COLUMN_MAPPING.items()}
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def validate_columns( dataframe, columns=COLUMNS ):
+    """ Confere se o Dataframe tem as colunas esperadas
+
+        Input: Dataframe, lista de colunas esperadas
+        Output: None. Levanta ValueError listando as colunas ausentes
+    """
+    missing = [col for col in columns if col not in dataframe.columns]
+    if missing:
+        raise ValueError(f'Colunas ausentes no dataset: {missing}')
+
+    return None
+
+
+# Função que renomeia as colunas do DataFrame para snake_case
+def rename_columns( dataframe ):
+    validate_columns(dataframe)
+
+    # Renomeação só dos metadados, sem copiar os dados
+    return dataframe.rename(columns=COLUMN_MAPPING, copy=False)
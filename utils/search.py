@@ -0,0 +1,159 @@
+# Bibliotecas
+import os
+import unicodedata
+
+import numpy as np
+
+from utils.dataset import load_artifact, register_artifact
+
+
+# =======================================================================================================================
+# Índice de trigramas para a busca de restaurantes
+# =======================================================================================================================
+# Os textos são normalizados (sem acentos, minúsculos, só letras, dígitos e espaço) e quebrados em trigramas.
+# Com um alfabeto de 37 símbolos mais o separador de linhas, cada trigrama vira um inteiro em [0, 38³), então o
+# vocabulário é denso e o índice invertido é um CSR: offsets[código] aponta para a fatia de rows com as linhas
+# que contêm o trigrama. Há um índice para o nome do restaurante e outro para o endereço/localidade.
+ALPHABET = ' abcdefghijklmnopqrstuvwxyz0123456789'
+SEPARATOR = len(ALPHABET)
+BASE = len(ALPHABET) + 1
+VOCABULARY = BASE ** 3
+
+FIELDS = {
+    'name': ['Restaurant Name'],
+    'location': ['Address', 'Locality', 'Locality Verbose', 'City'],
+    }
+# Peso de cada campo na pontuação: acertos no nome valem um pouco mais que acertos no endereço
+WEIGHTS = {'name': 1.0, 'location': 0.9}
+# Peso extra para linhas que casam a busca em mais de um campo
+ALL_FIELDS_WEIGHT = 0.1
+# Fração mínima dos trigramas da busca que um campo precisa conter (tolerância a erros de digitação)
+MIN_SIMILARITY = 0.5
+
+_CHAR_CODES = np.zeros(256, dtype=np.int64)
+for code, char in enumerate(ALPHABET):
+    _CHAR_CODES[ord(char)] = code
+_CHAR_CODES[ord('|')] = SEPARATOR
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def normalize( text ):
+    """ Remove acentos e pontuação: 'Las Piñas City' -> 'las pinas city' """
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = ''.join(char if char.isalnum() else ' ' for char in text)
+
+    return ' '.join(text.split())
+
+
+def _trigrams( buffer ):
+    """ Códigos dos trigramas de um texto normalizado e a máscara dos válidos
+
+        Trigramas que atravessam o separador de linhas ou que têm espaço no meio (juntam duas palavras)
+        são descartados.
+    """
+    chars = _CHAR_CODES[np.frombuffer(buffer.encode('ascii'), dtype=np.uint8)]
+    codes = chars[:-2] * BASE * BASE + chars[1:-1] * BASE + chars[2:]
+    valid = (chars[:-2] != SEPARATOR) & (chars[1:-1] != SEPARATOR) & (chars[2:] != SEPARATOR) & (chars[1:-1] != 0)
+
+    return codes, valid
+
+
+def _build_field( texts ):
+    """ Monta o CSR (offsets, rows) de um campo a partir dos textos normalizados de cada linha """
+    # Todas as linhas num único buffer: ' texto |' por linha, o espaço inicial marca o começo da palavra
+    padded = [f' {text} |' for text in texts]
+    lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+    row_of_char = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)
+
+    codes, valid = _trigrams(''.join(padded))
+    rows = row_of_char[:-2][valid]
+    codes = codes[valid]
+
+    # Um par (trigrama, linha) por linha, ordenado por trigrama
+    keys = np.unique(codes * len(padded) + rows)
+    codes, rows = np.divmod(keys, max(len(padded), 1))
+    offsets = np.zeros(VOCABULARY + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=VOCABULARY), out=offsets[1:])
+
+    return offsets, rows.astype(np.int32)
+
+
+def build_search_index( df1, directory ):
+    """ Gera o índice de trigramas na ingestão e grava os arrays em .npy (carregados com mmap pelos processos)
+
+        Input: Dataframe limpo, diretório do artefato
+    """
+    for field, cols in FIELDS.items():
+        texts = df1[cols[0]].astype(str)
+        for col in cols[1:]:
+            texts = texts + ' ' + df1[col].astype(str)
+        # Endereços e localidades se repetem muito: normaliza cada texto distinto uma única vez
+        texts = texts.map({text: normalize(text) for text in texts.unique()})
+
+        offsets, rows = _build_field(texts)
+        np.save(os.path.join(directory, f'{field}_offsets.npy'), offsets)
+        np.save(os.path.join(directory, f'{field}_rows.npy'), rows)
+
+    return None
+
+
+register_artifact('search', build_search_index)
+
+
+class SearchIndex:
+    """ Índice de trigramas de uma versão do dataset, mapeado em memória (somente leitura)
+
+        Input: diretório do artefato, quantidade de linhas do Dataframe
+    """
+    def __init__( self, directory, n_rows ):
+        self.n_rows = n_rows
+        self.fields = {field: (np.load(os.path.join(directory, f'{field}_offsets.npy'), mmap_mode='r'),
+                               np.load(os.path.join(directory, f'{field}_rows.npy'), mmap_mode='r'))
+                       for field in FIELDS}
+
+    def _hits( self, field, codes ):
+        """ Quantos trigramas da busca cada linha contém no campo """
+        offsets, rows = self.fields[field]
+        postings = [rows[offsets[code]:offsets[code + 1]] for code in codes]
+
+        return np.bincount(np.concatenate(postings), minlength=self.n_rows)
+
+    def search( self, query, linhas_selecionadas=None, k=20 ):
+        """ Busca aproximada e sem acentos
+
+            A similaridade de um campo é a fração dos trigramas da busca presentes nele. A pontuação é a maior
+            similaridade ponderada por WEIGHTS, mais um bônus para quem casa em vários campos. A última palavra
+            da busca é tratada como prefixo (busca enquanto digita).
+
+            Input: texto da busca, máscara booleana das linhas permitidas (ex.: filtro de país), k
+            Output: (posições das linhas ordenadas pela relevância, pontuações)
+        """
+        text = normalize(query)
+        if not text:
+            return np.array([], dtype=np.int64), np.array([])
+
+        codes, valid = _trigrams(f' {text}')
+        codes = np.unique(codes[valid])
+        if len(codes) == 0:
+            return np.array([], dtype=np.int64), np.array([])
+
+        similarity = {field: self._hits(field, codes) / len(codes) for field in FIELDS}
+        score = (np.maximum.reduce([WEIGHTS[field] * similarity[field] for field in FIELDS])
+                 + ALL_FIELDS_WEIGHT * sum(similarity.values()))
+        matches = np.maximum.reduce(list(similarity.values())) >= MIN_SIMILARITY
+        if linhas_selecionadas is not None:
+            matches &= linhas_selecionadas
+
+        candidates = np.flatnonzero(matches)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-score[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-score[candidates], kind='stable')]
+
+        return candidates, score[candidates]
+
+
+def load_search_index( version, df1 ):
+    """ Retorna o índice de busca da versão do dataset (carregado uma vez por processo) """
+    return load_artifact('search', version, df1, lambda directory: SearchIndex(directory, len(df1)))
@@ -0,0 +1,80 @@
+# Bibliotecas
+import streamlit as st
+
+from utils.scheduler import fingerprint
+
+
+# =======================================================================================================================
+# Seções com dependências declaradas
+# =======================================================================================================================
+# O Streamlit executa a página inteira a cada mudança de widget. Cada seção da página declara as entradas que lê
+# (valores de widgets, versão do dataset) e as tarefas que calcula. Se as entradas são as mesmas do último rerun
+# da sessão, as saídas da seção vêm do session_state e as tarefas nem são enviadas ao agendador; a seção só é
+# renderizada de novo. Assim mover o slider de quantidade de restaurantes recalcula somente a tabela que o usa.
+#
+# As entradas declaradas precisam cobrir tudo o que as tarefas da seção leem: uma entrada esquecida faz a seção
+# mostrar um resultado antigo.
+#
+# As saídas são guardadas à medida que são lidas. Um rerun interrompido no meio da seção (o Streamlit interrompe
+# o script no próximo st.* quando um widget muda) deixa só parte das saídas guardadas; as tarefas sem saída
+# são enviadas de novo no rerun seguinte, mesmo com as entradas iguais.
+
+
+class Section:
+    """ Uma seção da página: tarefas calculadas juntas a partir das mesmas entradas
+
+        Input: nome, página (SectionTracker), identificação das entradas
+    """
+    def __init__( self, name, tracker, signature ):
+        self.name = name
+        self.tracker = tracker
+        self.signature = signature
+
+        stored = tracker.store.get(name)
+        # Sem cache no agendador (medição do modo serial) a seção é sempre recalculada
+        self.stale = stored is None or stored[0] != signature or not tracker.scheduler.use_cache
+        self.outputs = {} if self.stale else stored[1]
+        self.recomputed = self.stale
+
+    def submit( self, task, func, *args, **kwargs ):
+        """ Envia a tarefa ao agendador somente se as entradas da seção mudaram ou se a tarefa ainda não tem
+            saída guardada (rerun anterior interrompido no meio da seção)
+        """
+        if self.stale or task not in self.outputs:
+            self.recomputed = True
+            self.tracker.scheduler.submit(f'{self.name}.{task}', func, *args, **kwargs)
+
+    def result( self, task ):
+        if task not in self.outputs:
+            self.outputs[task] = self.tracker.scheduler.result(f'{self.name}.{task}')
+            self.tracker.store[self.name] = (self.signature, self.outputs)
+
+        return self.outputs[task]
+
+
+class SectionTracker:
+    """ Seções de uma página e o relatório das que foram recalculadas no rerun
+
+        Input: chave única da página, agendador (utils/scheduler.py) usado para calcular as tarefas
+    """
+    def __init__( self, key, scheduler ):
+        self.key = key
+        self.scheduler = scheduler
+        self.store = st.session_state.setdefault(f'{key}_sections', {})
+        self.sections = {}
+
+    def section( self, name, **inputs ):
+        """ Declara uma seção e as entradas que ela lê (ex.: version=version, num_rest=num_rest) """
+        section = Section(name, self, fingerprint(tuple(sorted(inputs.items()))))
+        self.sections[name] = section
+
+        return section
+
+    def report( self ):
+        """ Escreve na barra lateral quais seções foram recalculadas neste rerun """
+        recomputed = [name for name, section in self.sections.items() if section.recomputed]
+        reused = [name for name, section in self.sections.items() if not section.recomputed]
+        st.sidebar.caption(f'Seções recalculadas: {", ".join(recomputed) or "nenhuma"}  \n'
+                           f'Seções reaproveitadas: {", ".join(reused) or "nenhuma"}')
+
+        return None
@@ -0,0 +1,188 @@
+# Bibliotecas
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.dataset import load_artifact, register_artifact
+from utils.ranking import top_k
+
+
+# =======================================================================================================================
+# Restaurantes semelhantes
+# =======================================================================================================================
+# Cada restaurante vira um vetor esparso com quatro blocos de atributos, cada bloco com norma igual ao seu peso:
+#   - culinárias: one-hot de cada culinária da coluna 'Cuisines' ('Italian, Pizza' -> Italian e Pizza)
+#   - faixa de preço: one-hot de 'Price range'
+#   - custo: percentil do preço para dois dentro do país (as moedas são diferentes), codificado como o vetor
+#     (cos, sen) de um ângulo entre 0 e 90°, então o produto escalar diminui com a diferença de custo
+#   - localização: one-hot da célula de CELL_SIZE graus de latitude/longitude
+# As linhas são normalizadas, então o produto escalar entre duas linhas é a similaridade do cosseno.
+#
+# A matriz é gravada com as linhas ordenadas por (país, célula). Os candidatos de uma consulta (mesmo país ou
+# células vizinhas) são faixas contíguas da matriz, então a similaridade é um produto matriz-vetor sobre
+# fatias da matriz mapeada em memória, sem copiá-la e sem calcular todos os pares.
+WEIGHTS = {'cuisines': 1.0, 'price': 0.5, 'cost': 0.5, 'location': 0.5}
+CELL_SIZE = 0.25
+CELLS_PER_ROW = int(round(360 / CELL_SIZE)) + 1
+CANDIDATES = {
+    'Mesmo país': 'country',
+    'Próximos (~25 km)': 'nearby',
+    }
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def _cell_keys( latitude, longitude ):
+    """ Chave inteira da célula de CELL_SIZE graus de cada ponto """
+    gy = np.floor((np.asarray(latitude, dtype=np.float64) + 90) / CELL_SIZE).astype(np.int64)
+    gx = np.floor((np.asarray(longitude, dtype=np.float64) + 180) / CELL_SIZE).astype(np.int64)
+
+    return gy * CELLS_PER_ROW + gx
+
+
+def _one_hot( codes, n_codes, n_rows ):
+    """ Bloco esparso com um 1 por linha na coluna `codes` """
+    return sp.csr_matrix((np.ones(n_rows), (np.arange(n_rows), codes)), shape=(n_rows, n_codes))
+
+
+def build_features( df1 ):
+    """ Matriz esparsa normalizada dos atributos dos restaurantes (linhas na ordem do Dataframe)
+
+        Input: Dataframe limpo
+        Output: matriz CSR (n_linhas x n_atributos)
+    """
+    n_rows = len(df1)
+
+    # Culinárias: uma linha da lista por (restaurante, culinária), peso dividido igualmente entre as culinárias
+    cuisines = df1['Cuisines'].str.split(',').explode().str.strip()
+    cuisines = cuisines[cuisines != 'nan']
+    names, codes = np.unique(cuisines.to_numpy(dtype=str), return_inverse=True)
+    rows = cuisines.index.to_numpy()
+    counts = np.bincount(rows, minlength=n_rows)
+    block_cuisines = sp.csr_matrix((1 / np.sqrt(counts[rows]), (rows, codes)), shape=(n_rows, len(names)))
+
+    # Faixa de preço de 1 a 4
+    block_price = _one_hot(df1['Price range'].to_numpy(dtype=np.int64) - 1, 4, n_rows)
+
+    # Custo: percentil dentro do país
+    percentile = df1.groupby('Country Code')['Average Cost for two'].rank(pct=True).to_numpy()
+    angle = percentile * np.pi / 2
+    block_cost = sp.csr_matrix(np.column_stack([np.cos(angle), np.sin(angle)]))
+
+    # Localização: célula de CELL_SIZE graus
+    _, cells = np.unique(_cell_keys(df1['Latitude'], df1['Longitude']), return_inverse=True)
+    block_location = _one_hot(cells, cells.max() + 1 if n_rows else 0, n_rows)
+
+    blocks = {'cuisines': block_cuisines, 'price': block_price, 'cost': block_cost, 'location': block_location}
+    features = sp.hstack([WEIGHTS[name] * block for name, block in blocks.items()], format='csr')
+
+    norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+    features = sp.diags(1 / np.where(norms > 0, norms, 1)) @ features
+
+    return features.tocsr()
+
+
+def build_similarity( df1, directory ):
+    """ Gera a matriz de atributos na ingestão, ordenada por (país, célula), e grava os arrays em .npy
+
+        Input: Dataframe limpo, diretório do artefato
+    """
+    countries = df1['Country Code'].to_numpy(dtype=np.int64)
+    cells = _cell_keys(df1['Latitude'], df1['Longitude'])
+    order = np.lexsort((cells, countries))
+
+    features = build_features(df1)[order]
+    features.sort_indices()
+
+    np.save(os.path.join(directory, 'data.npy'), features.data.astype(np.float32))
+    np.save(os.path.join(directory, 'indices.npy'), features.indices.astype(np.int32))
+    np.save(os.path.join(directory, 'indptr.npy'), features.indptr.astype(np.int64))
+    np.save(os.path.join(directory, 'shape.npy'), np.array(features.shape, dtype=np.int64))
+    np.save(os.path.join(directory, 'order.npy'), order.astype(np.int64))
+    np.save(os.path.join(directory, 'countries.npy'), countries[order])
+    np.save(os.path.join(directory, 'cells.npy'), cells[order])
+
+    return None
+
+
+register_artifact('similarity', build_similarity)
+
+
+class Similarity:
+    """ Matriz de atributos de uma versão do dataset, mapeada em memória (somente leitura)
+
+        Input: diretório do artefato
+    """
+    def __init__( self, directory ):
+        def load( name ):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+        self.data, self.indices, self.indptr = load('data'), load('indices'), load('indptr')
+        self.n_features = int(load('shape')[1])
+        self.order = load('order')
+        self.countries = load('countries')
+        self.cells = load('cells')
+        # Posição de cada linha do Dataframe na matriz ordenada
+        self.position = np.empty(len(self.order), dtype=np.int64)
+        self.position[self.order] = np.arange(len(self.order))
+
+    def _block( self, start, stop ):
+        """ Fatia contígua de linhas da matriz, sem copiar os dados """
+        first, last = self.indptr[start], self.indptr[stop]
+
+        return sp.csr_matrix((self.data[first:last], self.indices[first:last], self.indptr[start:stop + 1] - first),
+                             shape=(stop - start, self.n_features), copy=False)
+
+    def _ranges( self, position, candidates ):
+        """ Faixas [início, fim) da matriz ordenada com os candidatos de uma linha """
+        country = self.countries[position]
+        start = np.searchsorted(self.countries, country, side='left')
+        stop = np.searchsorted(self.countries, country, side='right')
+        if candidates == 'country':
+            return [(start, stop)]
+
+        # Células vizinhas (3 x 3) dentro do mesmo país: cada célula é uma faixa contígua
+        cell = self.cells[position]
+        cells = self.cells[start:stop]
+        ranges = []
+        for dy in (-CELLS_PER_ROW, 0, CELLS_PER_ROW):
+            for dx in (-1, 0, 1):
+                left = np.searchsorted(cells, cell + dy + dx, side='left')
+                right = np.searchsorted(cells, cell + dy + dx, side='right')
+                if right > left:
+                    ranges.append((start + left, start + right))
+
+        return ranges
+
+    def similar( self, row, k=10, candidates='country', exclude=None ):
+        """ Os k restaurantes mais semelhantes a uma linha, pela similaridade do cosseno
+
+            Input: posição da linha no Dataframe, k, 'country' ou 'nearby', máscara das linhas a descartar
+                   (ex.: o mesmo restaurante repetido)
+            Output: (posições das linhas no Dataframe, similaridades)
+        """
+        position = self.position[row]
+        query = self._block(position, position + 1).toarray().ravel()
+
+        positions, scores = [], []
+        for start, stop in self._ranges(position, candidates):
+            positions.append(np.arange(start, stop))
+            scores.append(self._block(start, stop) @ query)
+        positions = np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+        scores = np.concatenate(scores) if scores else np.array([])
+
+        rows = np.asarray(self.order[positions])
+        keep = rows != row
+        if exclude is not None:
+            keep &= ~exclude[rows]
+
+        best = top_k(scores, np.flatnonzero(keep), k)
+
+        return rows[best], scores[best]
+
+
+def load_similarity( version, df1 ):
+    """ Retorna a matriz de atributos da versão do dataset (carregada uma vez por processo) """
+    return load_artifact('similarity', version, df1, Similarity)
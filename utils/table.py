@@ -0,0 +1,124 @@
+# Bibliotecas
+import os
+
+import numpy as np
+import streamlit as st
+from pandas.api.types import is_numeric_dtype
+
+from utils.dataset import load_artifact, register_artifact
+from utils.schema import COLUMN_MAPPING
+
+
+# =======================================================================================================================
+# Tabela de restaurantes paginada no servidor
+# =======================================================================================================================
+# Para cada coluna da tabela a ingestão grava as permutações que ordenam o dataset inteiro por ela, em ordem
+# crescente e decrescente. As duas são estáveis: linhas com valores iguais ficam na ordem do dataset. Ordenar a
+# seleção de uma sessão é só filtrar a permutação pela máscara (O(n), sem ordenar de novo). A ordem filtrada fica na
+# sessão até a seleção ou a ordenação mudarem, então trocar de página é uma fatia e somente as linhas e colunas
+# visíveis da página são enviadas ao navegador.
+TABLE_COLUMNS = ['Restaurant Name', 'Country Name', 'City', 'Locality', 'Cuisines', 'Average Cost for two', 'Currency',
+                 'Price range', 'Aggregate rating', 'Rating text', 'Votes', 'Has Online delivery', 'Has Table booking']
+DEFAULT_COLUMNS = ['Restaurant Name', 'Country Name', 'City', 'Cuisines', 'Average Cost for two', 'Currency',
+                   'Aggregate rating', 'Votes']
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def _sort_key( series ):
+    """ Valores usados na ordenação: números como float, textos (object, Categorical ou string do Arrow) sem
+        diferenciar maiúsculas
+    """
+    if is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64)
+
+    return series.astype(str).str.lower().to_numpy(dtype=str)
+
+
+def _order_file( directory, col, ascending ):
+    return os.path.join(directory, f'{COLUMN_MAPPING[col]}_{"asc" if ascending else "desc"}.npy')
+
+
+def build_sort_permutations( df1, directory ):
+    """ Gera na ingestão as permutações de ordenação crescente e decrescente de cada coluna da tabela
+
+        A ordem decrescente é a ordenação estável do posto negado, e não a crescente invertida, para que os
+        empates continuem na ordem do dataset.
+
+        Input: Dataframe limpo, diretório do artefato
+    """
+    for col in TABLE_COLUMNS:
+        _, ranks = np.unique(_sort_key(df1[col]), return_inverse=True)
+        for ascending, key in ((True, ranks), (False, -ranks)):
+            np.save(_order_file(directory, col, ascending), np.argsort(key, kind='stable').astype(np.int32))
+
+    return None
+
+
+register_artifact('table_orders', build_sort_permutations)
+
+
+class SortPermutations:
+    """ Permutações de ordenação de uma versão do dataset, mapeadas em memória
+
+        Input: diretório do artefato
+    """
+    def __init__( self, directory ):
+        self.orders = {(col, ascending): np.load(_order_file(directory, col, ascending), mmap_mode='r')
+                       for col in TABLE_COLUMNS for ascending in (True, False)}
+
+    def sorted_rows( self, linhas_selecionadas, col, ascending=True ):
+        """ Posições das linhas selecionadas ordenadas pela coluna
+
+            Input: máscara booleana das linhas, coluna (nome original), ordem crescente ou não
+        """
+        order = self.orders[col, ascending]
+
+        return np.asarray(order[linhas_selecionadas[order]])
+
+
+def load_sort_permutations( version, df1 ):
+    """ Retorna as permutações de ordenação da versão do dataset (carregadas uma vez por processo) """
+    return load_artifact('table_orders', version, df1, SortPermutations)
+
+
+def table_panel( df1, linhas_selecionadas, permutations, version, key ):
+    """ Tabela navegável das linhas selecionadas: ordenação por coluna, paginação e escolha das colunas
+
+        Input: Dataframe (colunas em snake_case), máscara das linhas, permutações e versão do dataset, chave única
+               da página
+    """
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        sort_col = st.selectbox('Ordenar por', TABLE_COLUMNS, index=TABLE_COLUMNS.index('Aggregate rating'),
+                                format_func=lambda col: COLUMN_MAPPING[col], key=f'{key}_sort')
+    with col2:
+        ascending = st.radio('Ordem', ['Decrescente', 'Crescente'], key=f'{key}_ascending', horizontal=True) == 'Crescente'
+    with col3:
+        page_size = st.selectbox('Linhas por página', PAGE_SIZES, key=f'{key}_page_size')
+
+    cols = st.multiselect('Colunas', TABLE_COLUMNS, default=DEFAULT_COLUMNS, format_func=lambda col: COLUMN_MAPPING[col],
+                          key=f'{key}_columns')
+
+    # Ordem filtrada guardada na sessão: trocar de página ou de colunas não refaz a filtragem. A versão faz parte
+    # da identificação: com uma nova versão publicada a mesma máscara aponta para outras linhas
+    signature = (version, sort_col, ascending, len(linhas_selecionadas), hash(linhas_selecionadas.tobytes()))
+    cached = st.session_state.get(f'{key}_rows')
+    if cached is None or cached[0] != signature:
+        cached = (signature, permutations.sorted_rows(linhas_selecionadas, sort_col, ascending))
+        st.session_state[f'{key}_rows'] = cached
+    rows = cached[1]
+
+    pages = max(1, -(-len(rows) // page_size))
+    with col4:
+        page = st.number_input(f'Página (de {pages})', min_value=1, max_value=pages, value=1, step=1, key=f'{key}_page')
+    page = min(int(page), pages)
+
+    page_rows = rows[(page - 1) * page_size:page * page_size]
+    st.dataframe(df1.iloc[page_rows][[COLUMN_MAPPING[col] for col in cols]], use_container_width=True)
+    st.caption(f'{len(rows)} restaurantes · linhas {(page - 1) * page_size + min(1, len(page_rows))} a '
+               f'{(page - 1) * page_size + len(page_rows)}')
+
+    return None
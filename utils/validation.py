@@ -0,0 +1,105 @@
+# Bibliotecas
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# =======================================================================================================================
+# Validação do dataset bruto na ingestão
+# =======================================================================================================================
+# Cada regra é uma checagem vetorizada sobre colunas inteiras que devolve a máscara das linhas que FALHAM.
+# As linhas que falham em qualquer regra vão para a quarentena com os motivos, e o restante segue para a limpeza.
+# Assim um código de país ou de cor desconhecido não derruba mais as páginas.
+#
+# As colunas numéricas são convertidas uma única vez antes das regras: um único valor não numérico no CSV faz o
+# pandas ler a coluna inteira como texto, e sem a conversão as regras e a limpeza comparariam strings. O valor
+# inválido vira NaN, falha na regra da coluna e somente a sua linha vai para a quarentena.
+NUMERIC_COLUMNS = ['Restaurant ID', 'Country Code', 'Longitude', 'Latitude', 'Average Cost for two', 'Price range',
+                   'Aggregate rating', 'Votes']
+# Colunas inteiras no dataset limpo (viram float na conversão quando o CSV tem algum valor inválido)
+INTEGER_COLUMNS = ['Restaurant ID', 'Country Code', 'Average Cost for two', 'Price range', 'Votes']
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+def coerce_numeric( df, columns=NUMERIC_COLUMNS ):
+    """ Converte as colunas numéricas do Dataframe bruto; valores não numéricos viram NaN
+
+        Input: Dataframe bruto (CSV), colunas numéricas
+        Output: novo Dataframe com as colunas convertidas (as demais colunas não são copiadas)
+    """
+    return df.assign(**{col: pd.to_numeric(df[col], errors='coerce') for col in columns})
+
+
+def restore_integers( df, columns=INTEGER_COLUMNS ):
+    """ Volta para int64 as colunas inteiras que viraram float na conversão, quando todos os valores
+        restantes são inteiros (as linhas com valores inválidos já foram descartadas)
+    """
+    for col in columns:
+        values = df[col]
+        if values.dtype.kind == 'f' and values.notna().all() and (values % 1 == 0).all():
+            df[col] = values.astype(np.int64)
+
+    return df
+
+
+def _out_of_range( series, low, high ):
+    """ Valores nulos ou fora do intervalo fechado [low, high] """
+    values = pd.to_numeric(series, errors='coerce')
+
+    return (values.isna() | (values < low) | (values > high)).to_numpy()
+
+
+def build_rules( countries, colors ):
+    """ Regras de validação: {nome: função(Dataframe) -> máscara das linhas inválidas}
+
+        Input: dicionários de países e de cores conhecidos
+    """
+    return {
+        'restaurante_sem_id': lambda df: df['Restaurant ID'].isna().to_numpy(),
+        'restaurante_sem_nome': lambda df: df['Restaurant Name'].isna().to_numpy(),
+        'pais_desconhecido': lambda df: ~df['Country Code'].isin(list(countries)).to_numpy(),
+        'cor_desconhecida': lambda df: ~df['Rating color'].isin(list(colors)).to_numpy(),
+        'latitude_invalida': lambda df: _out_of_range(df['Latitude'], -90, 90),
+        'longitude_invalida': lambda df: _out_of_range(df['Longitude'], -180, 180),
+        'custo_negativo': lambda df: _out_of_range(df['Average Cost for two'], 0, np.inf),
+        'avaliacao_fora_do_intervalo': lambda df: _out_of_range(df['Aggregate rating'], 0, 5),
+        'votos_negativos': lambda df: _out_of_range(df['Votes'], 0, np.inf),
+        'faixa_de_preco_invalida': lambda df: ~df['Price range'].isin([1, 2, 3, 4]).to_numpy(),
+        }
+
+
+def validate_rows( df, rules, raw=None ):
+    """ Executa todas as regras sobre o Dataframe bruto
+
+        Input: Dataframe bruto com as colunas numéricas convertidas (coerce_numeric), regras, Dataframe lido do
+               CSV (opcional: a quarentena guarda os valores originais, não os NaN da conversão)
+        Output: (máscara das linhas válidas, Dataframe da quarentena com a coluna 'Motivos', contagem por regra)
+    """
+    failures = {name: rule(df) for name, rule in rules.items()}
+    counts = {name: int(mask.sum()) for name, mask in failures.items()}
+
+    invalid = np.logical_or.reduce(list(failures.values())) if failures else np.zeros(len(df), dtype=bool)
+    rows = np.flatnonzero(invalid)
+
+    # Motivos montados só para as linhas em quarentena: 'regra1;regra2'
+    reasons = pd.Series('', index=rows, dtype=object)
+    for name, mask in failures.items():
+        reasons = reasons + np.where(mask[rows], f'{name};', '')
+
+    quarantine = (df if raw is None else raw).iloc[rows].copy()
+    quarantine['Motivos'] = reasons.str.rstrip(';').to_numpy()
+
+    return ~invalid, quarantine, counts
+
+
+def write_quarantine( quarantine, counts, directory ):
+    """ Grava a quarentena (CSV com os motivos) e o relatório com a contagem por regra """
+    quarantine.to_csv(os.path.join(directory, 'quarantine.csv'), index=False)
+    with open(os.path.join(directory, 'report.json'), 'w') as f:
+        json.dump({'quarantined': len(quarantine), 'rules': counts}, f, indent=2)
+
+    return None
@@ -0,0 +1,67 @@
+# Bibliotecas
+import glob
+import logging
+import os
+import runpy
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.dataset import WARMUP_THREAD, register_warmer, warmup_status
+
+
+# =======================================================================================================================
+# Aquecimento das páginas a cada nova versão do dataset
+# =======================================================================================================================
+# Cada página é executada uma vez, fora de qualquer sessão, numa thread em segundo plano. Sem sessão os widgets
+# devolvem o valor padrão (os países e culinárias padrão da barra lateral) e os elementos não são enviados a
+# ninguém, mas todo o resto acontece: importações, anexação dos artefatos e o cálculo dos gráficos da seleção
+# padrão, que fica no cache de saídas do agendador (utils/scheduler.py). A primeira sessão depois de um deploy
+# ou de uma nova versão já encontra tudo pronto.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['Home.py'] + sorted(os.path.relpath(page, ROOT) for page in glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+
+# =======================================================================================================================
+# Funções
+# =======================================================================================================================
+class _WarmupThreadFilter(logging.Filter):
+    """ Descarta os avisos do Streamlit de chamadas fora de uma sessão vindos da thread de aquecimento """
+    def filter( self, record ):
+        return not (threading.current_thread().name == WARMUP_THREAD and 'ScriptRunContext' in record.getMessage())
+
+
+def warm_pages( version, df1 ):
+    """ Executa cada página com a seleção padrão para a versão do dataset
+
+        Input: versão e Dataframe que está sendo aquecido (as páginas o recebem de current_dataset())
+    """
+    start = time.perf_counter()
+    for page in PAGES:
+        page_start = time.perf_counter()
+        try:
+            runpy.run_path(os.path.join(ROOT, page), run_name='__main__')
+        except Exception as error:
+            print(f'[aquecimento] versão {version}: {page} falhou: {error!r}')
+            continue
+        print(f'[aquecimento] versão {version}: {page} em {(time.perf_counter() - page_start) * 1000:.0f} ms')
+
+    print(f'[aquecimento] versão {version} pronta em {time.perf_counter() - start:.1f} s')
+
+    return None
+
+
+register_warmer(warm_pages)
+logging.getLogger(get_script_run_ctx.__module__).addFilter(_WarmupThreadFilter())
+
+
+def show_warmup_status():
+    """ Avisa na barra lateral quando uma nova versão do dataset está sendo preparada """
+    status = warmup_status()
+    if status['warming'] is not None and status['warming'] != status['version']:
+        st.sidebar.caption(f'Nova versão do dataset ({status["warming"]}) em preparação. '
+                           f'Exibindo a versão {status["version"]}.')
+
+    return None